@@ -1,15 +1,21 @@
 # app_gui.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk
 import numpy as np
 import threading
-import time
 import random
-import math
-import pyautogui
+import time
+from collections import deque
 
-from perlin_noise import Perlin # Import from the local module
+from noise_engine import NoiseEngine, ENGINE_NAMES, create_engine # Import from the local module
+from noise_cache import NoiseCache
+from playback import play_path, PlaybackReport
+from route import play_route, RouteReport
+from trajectory_file import TrajectoryReader, TrajectoryFileError, save_trajectory, fits_int16, TRAJECTORY_SUFFIX
+from cursor_output import CursorBackend, CursorBackendError, PyAutoGUIBackend
+from metrics import SimulationStats
+from config import DEFAULT_CFG
 
 class App:
     """
@@ -18,40 +24,56 @@ class App:
     """
     # Constants for drawing
     POINT_RADIUS = 6
+    WAYPOINT_RADIUS = 4
     POINT_OUTLINE_WIDTH = 3
     PATH_LINE_WIDTH = 2
-    # Minimal distance (squared) to target for stopping, e.g., 0.5 pixels
-    MIN_DISTANCE_TO_TARGET_SQUARED = 0.5 * 0.5
+    # Interval (ms) at which queued path points are drawn, ~60 fps
+    PATH_FRAME_MS = 16
+    # Points per polyline item before a new item is started, bounding the cost of coords()
+    PATH_CHUNK_POINTS = 1000
+    # How playback recovers from overrunning steps: "compress" emits every point, "skip" drops late ones
+    PLAYBACK_CATCH_UP = "compress"
 
 
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, cursor_backend: CursorBackend | None = None,
+                 stats: SimulationStats | None = None):
         """
         Initializes the application.
         Args:
             root: The main tkinter window.
+            cursor_backend: Where cursor moves go. Defaults to the real cursor via pyautogui.
+            stats: Metrics collected from the simulation. Defaults to disabled stats.
         """
         self.root = root
+        self.cursor = cursor_backend if cursor_backend is not None else PyAutoGUIBackend()
+        self.stats = stats if stats is not None else SimulationStats(enabled=False)
         root.title("Perlin Noise Mouse Simulator")
 
         # --- Default Configs ---
-        self.cfg = {
-            "win_w": 1920, "win_h": 1080,
-            "noise_scale": 100.0,
-            "res_scale": 1,
-            "speed_min": 30, "speed_max_mul": 1.5,
-            "jitter_mul": 20,
-            "dev_deg": 35.0,
-            "sleep": 0.03
-            # "target_threshold" is now removed
-        }
+        self.cfg = dict(DEFAULT_CFG)
         self.running = False
-        self.perlin = Perlin()
+        self.noise_engine = self._make_noise_engine()
+        self.noise_cache = NoiseCache()
         self.A: tuple[float, float] | None = None
         self.B: tuple[float, float] | None = None
+        # Intermediate points visited in order between A and B
+        self.waypoints: list[tuple[float, float]] = []
         self.noise_arr: np.ndarray | None = None
         self.noise_img: ImageTk.PhotoImage | None = None
+        # (engine params, noise_scale, res_scale) that self.noise_arr was generated with
+        self._noise_params: tuple | None = None
         self._resize_job: str | None = None
 
+        # Points produced by the simulation thread, drawn by the Tk main loop
+        self._path_buffer: deque[tuple[float, float]] = deque()
+        self._path_drain_job: str | None = None
+        self._path_item: int | None = None
+        self._path_coords: list[float] = []
+        self.last_playback_report: RouteReport | None = None
+        # Points emitted by the last simulation as (t, x, y), and what they were generated with
+        self._run_record: list[tuple[float, float, float]] = []
+        self._run_info: dict | None = None
+
 
         self.mainframe = ttk.Frame(root)
         self.mainframe.pack(fill="both", expand=True)
@@ -70,8 +92,8 @@ class App:
 
         # Define the order and presence of GUI configuration entries
         self.gui_config_order = [
-            "win_w", "win_h", "noise_scale", "res_scale",
-            "speed_min", "speed_max_mul", "jitter_mul", "dev_deg", "sleep"
+            "win_w", "win_h", "noise_engine", "noise_scale", "octaves", "lacunarity", "persistence", "res_scale",
+            "speed_min", "speed_max_mul", "jitter_mul", "dev_deg", "sleep", "waypoints", "seed"
         ]
 
         current_gui_row = 0
@@ -79,9 +101,13 @@ class App:
             if k not in self.cfg: continue 
             default_val = self.cfg[k]
             ttk.Label(cfgframe, text=k).grid(row=current_gui_row, column=0, sticky="w", pady=2, padx=5)
-            var_type = tk.IntVar if k in ("win_w", "win_h") else tk.DoubleVar
-            var = var_type(value=default_val)
-            ent = ttk.Entry(cfgframe, textvariable=var, width=10)
+            if k == "noise_engine":
+                var = tk.StringVar(value=default_val)
+                ent = ttk.Combobox(cfgframe, textvariable=var, values=ENGINE_NAMES, width=8)
+            else:
+                var_type = tk.IntVar if k in ("win_w", "win_h", "octaves", "waypoints", "seed") else tk.DoubleVar
+                var = var_type(value=default_val)
+                ent = ttk.Entry(cfgframe, textvariable=var, width=10)
             ent.grid(row=current_gui_row, column=1, pady=2, padx=5, sticky="ew")
             self.entries[k] = var
             self.config_widgets.append(ent)
@@ -92,7 +118,7 @@ class App:
         self.apply_btn.grid(row=current_gui_row, column=0, columnspan=2, pady=(10,5), sticky="ew")
         current_gui_row +=1
 
-        self.new_ab_btn = ttk.Button(cfgframe, text="New A/B Points", command=self._generate_and_draw_new_ab_points)
+        self.new_ab_btn = ttk.Button(cfgframe, text="New A/B & Waypoints", command=self._generate_and_draw_new_ab_points)
         self.new_ab_btn.grid(row=current_gui_row, column=0, columnspan=2, pady=5, sticky="ew")
         current_gui_row +=1
 
@@ -106,8 +132,17 @@ class App:
         
         self.stop_btn = ttk.Button(cfgframe, text="Stop Simulation", command=self.stop_simulation, state=tk.DISABLED)
         self.stop_btn.grid(row=current_gui_row, column=0, columnspan=2, pady=5, sticky="ew")
+        current_gui_row +=1
 
-        self.simulation_control_buttons = [self.apply_btn, self.new_ab_btn, self.start_btn, self.clear_path_btn]
+        self.save_path_btn = ttk.Button(cfgframe, text="Save Last Path", command=self.save_last_path)
+        self.save_path_btn.grid(row=current_gui_row, column=0, columnspan=2, pady=5, sticky="ew")
+        current_gui_row +=1
+
+        self.replay_btn = ttk.Button(cfgframe, text="Replay Path File", command=self.replay_path_file)
+        self.replay_btn.grid(row=current_gui_row, column=0, columnspan=2, pady=5, sticky="ew")
+
+        self.simulation_control_buttons = [self.apply_btn, self.new_ab_btn, self.start_btn, self.clear_path_btn,
+                                           self.save_path_btn, self.replay_btn]
 
         root.bind("<Escape>", self.stop_simulation)
         root.bind("<Configure>", self.handle_resize)
@@ -117,6 +152,10 @@ class App:
         self._refresh_canvas_environment()
         self._update_ui_state()
 
+    def _make_noise_engine(self) -> NoiseEngine:
+        return create_engine(self.cfg["noise_engine"], seed=self.cfg["seed"], octaves=self.cfg["octaves"],
+                             lacunarity=self.cfg["lacunarity"], persistence=self.cfg["persistence"])
+
     def _validate_config(self) -> bool:
         try:
             cfg_values = {}
@@ -125,8 +164,16 @@ class App:
 
             if not (100 <= cfg_values["win_w"] <= 8000 and 100 <= cfg_values["win_h"] <= 8000):
                 raise ValueError("Window dimensions out of reasonable range (e.g., 100-8000 W/H).")
+            if cfg_values["noise_engine"] not in ENGINE_NAMES:
+                raise ValueError(f"Noise engine must be one of: {', '.join(ENGINE_NAMES)}.")
             if not (0.0001 < cfg_values["noise_scale"]):
                 raise ValueError("Noise scale must be positive and greater than a very small threshold.")
+            if not (1 <= cfg_values["octaves"] <= 12):
+                raise ValueError("Octaves must be between 1 and 12.")
+            if not (1.0 <= cfg_values["lacunarity"] <= 8.0):
+                raise ValueError("Lacunarity must be between 1.0 and 8.0.")
+            if not (0.0 < cfg_values["persistence"] <= 1.0):
+                raise ValueError("Persistence must be greater than 0.0 and at most 1.0.")
             if not (0.01 <= cfg_values["res_scale"] <= 1.0):
                 raise ValueError("Resolution scale must be between 0.01 and 1.0.")
             if not (0 <= cfg_values["speed_min"]):
@@ -137,6 +184,10 @@ class App:
                 raise ValueError("Jitter multiplier must be non-negative.")
             if not (0.0 <= cfg_values["sleep"] < 1.0):
                 raise ValueError("Sleep time must be non-negative and ideally < 1.0s.")
+            if not (0 <= cfg_values["waypoints"] <= 1000):
+                raise ValueError("Waypoints must be between 0 and 1000.")
+            if not (0 <= cfg_values["seed"]):
+                raise ValueError("Seed must be a non-negative integer.")
             # No target_threshold to validate
             return True
         except tk.TclError as e:
@@ -153,6 +204,10 @@ class App:
         for k, var in self.entries.items(): # self.entries only contains GUI editable cfgs
             self.cfg[k] = var.get()
 
+        engine = self._make_noise_engine()
+        if engine.params != self.noise_engine.params:
+            self.noise_engine = engine
+
         new_geo_w = int(self.cfg['win_w'])
         new_geo_h = int(self.cfg['win_h'])
         
@@ -162,7 +217,12 @@ class App:
         self.root.update_idletasks() 
         self._refresh_canvas_environment()
 
-    def _refresh_canvas_environment(self):
+    def _refresh_canvas_environment(self, persist: bool = True):
+        """
+        Regenerates the noise map and A/B points for the current canvas size.
+        persist=False keeps a newly computed map out of the disk cache, as for
+        the transient sizes a window passes through while being resized.
+        """
         self.stop_simulation() 
         self.canvas.delete("all")
         
@@ -174,25 +234,59 @@ class App:
         if w <= 1 or h <= 1: 
             if hasattr(self, "_initial_refresh_retry_job") and self._initial_refresh_retry_job:
                 self.root.after_cancel(self._initial_refresh_retry_job)
-            self._initial_refresh_retry_job = self.root.after(50, self._refresh_canvas_environment)
+            self._initial_refresh_retry_job = self.root.after(50, lambda: self._refresh_canvas_environment(persist))
             return
 
-        self._generate_noise_texture(w, h)
-        self._draw_noise_on_canvas()
-        self._generate_and_draw_new_ab_points(specific_canvas_wh=(w,h))
+        with self.stats.time("refresh_canvas"):
+            self._generate_noise_texture(w, h, persist)
+            self._draw_noise_on_canvas()
+            self._generate_and_draw_new_ab_points(specific_canvas_wh=(w,h))
 
-    def _generate_noise_texture(self, canvas_w: int, canvas_h: int):
+    def _generate_noise_texture(self, canvas_w: int, canvas_h: int, persist: bool = True):
         rs = self.cfg["res_scale"]
         noise_map_w = max(1, int(canvas_w * rs))
         noise_map_h = max(1, int(canvas_h * rs))
 
-        self.noise_arr = self.perlin.noise_array(noise_map_w, noise_map_h, self.cfg["noise_scale"])
-        
-        img_array = np.clip(self.noise_arr * 255, 0, 255).astype(np.uint8)
-        img = Image.fromarray(img_array, mode="L")
+        # Maps are deterministic for a given seed, so identical settings reuse the cached map.
+        params = (self.noise_engine.params, float(self.cfg["noise_scale"]), float(rs))
+        key = (params[0], canvas_w, canvas_h, params[1], params[2])
+        with self.stats.time("noise_generate"):
+            self.noise_arr = self.noise_cache.get_or_compute(
+                key, lambda: self._compute_noise_map(noise_map_w, noise_map_h, params), persist)
+        self._noise_params = params
         
-        resized_img = img.resize((canvas_w, canvas_h), Image.Resampling.LANCZOS if hasattr(Image.Resampling, 'LANCZOS') else Image.LANCZOS)
-        self.noise_img = ImageTk.PhotoImage(resized_img)
+        with self.stats.time("noise_render"):
+            img_array = np.clip(self.noise_arr * 255, 0, 255).astype(np.uint8)
+            img = Image.fromarray(img_array, mode="L")
+            
+            resized_img = img.resize((canvas_w, canvas_h), Image.Resampling.LANCZOS if hasattr(Image.Resampling, 'LANCZOS') else Image.LANCZOS)
+            self.noise_img = ImageTk.PhotoImage(resized_img)
+
+    def _compute_noise_map(self, map_w: int, map_h: int, params: tuple) -> np.ndarray:
+        """
+        Builds a noise map of the given size, reusing the current map where possible.
+        Noise depends only on the pixel coordinate, so after a resize with unchanged
+        noise settings a smaller map is a crop and a larger one only needs the newly
+        exposed right and bottom strips.
+        """
+        scale = self.cfg["noise_scale"]
+        prev = self.noise_arr
+        if prev is None or self._noise_params != params:
+            return self.noise_engine.noise_array(map_w, map_h, scale, dtype=np.float32)
+
+        prev_h, prev_w = prev.shape
+        if map_w <= prev_w and map_h <= prev_h:
+            # A copy, so the cache does not keep the larger map alive behind a view it counts as smaller
+            return prev[:map_h, :map_w].copy()
+
+        keep_w, keep_h = min(prev_w, map_w), min(prev_h, map_h)
+        noise_map = np.empty((map_h, map_w), dtype=np.float32)
+        noise_map[:keep_h, :keep_w] = prev[:keep_h, :keep_w]
+        if map_w > keep_w: # Right strip next to the kept region
+            noise_map[:keep_h, keep_w:] = self.noise_engine.noise_window(keep_w, 0, map_w - keep_w, keep_h, scale, dtype=np.float32)
+        if map_h > keep_h: # Bottom strip across the full width
+            noise_map[keep_h:, :] = self.noise_engine.noise_window(0, keep_h, map_w, map_h - keep_h, scale, dtype=np.float32)
+        return noise_map
 
     def _draw_noise_on_canvas(self):
         if self.noise_img:
@@ -203,6 +297,7 @@ class App:
 
         self.canvas.delete("point_a_oval")
         self.canvas.delete("point_b_oval")
+        self.canvas.delete("waypoint_oval")
         self.clear_drawn_path() 
 
         if specific_canvas_wh:
@@ -216,25 +311,92 @@ class App:
         padding = self.POINT_RADIUS + 5 
         self.A = (random.uniform(padding, w - padding), random.uniform(padding, h - padding))
         self.B = (random.uniform(padding, w - padding), random.uniform(padding, h - padding))
+        self.waypoints = [(random.uniform(padding, w - padding), random.uniform(padding, h - padding))
+                          for _ in range(int(self.cfg["waypoints"]))]
+        self._draw_ab_points()
+
+    def set_route(self, points: list[tuple[float, float]]):
+        """
+        Sets the route of the next simulation from a sequence of canvas points:
+        the first is A, the last is B and any in between are waypoints.
+        """
+        if len(points) < 2:
+            raise ValueError("A route needs at least two points.")
+        self.stop_simulation()
+        self.canvas.delete("point_a_oval")
+        self.canvas.delete("point_b_oval")
+        self.canvas.delete("waypoint_oval")
+        self.clear_drawn_path()
+        self.A = (float(points[0][0]), float(points[0][1]))
+        self.B = (float(points[-1][0]), float(points[-1][1]))
+        self.waypoints = [(float(x), float(y)) for x, y in points[1:-1]]
         self._draw_ab_points()
 
     def _draw_ab_points(self):
         if self.A and self.B:
-            r, lw = self.POINT_RADIUS, self.POINT_OUTLINE_WIDTH
+            r, lw = self.WAYPOINT_RADIUS, self.POINT_OUTLINE_WIDTH
+            for x, y in self.waypoints:
+                self.canvas.create_oval(x-r, y-r, x+r, y+r, outline="green", width=lw, tags="waypoint_oval")
+            r = self.POINT_RADIUS
             self.canvas.create_oval(self.A[0]-r, self.A[1]-r, self.A[0]+r, self.A[1]+r,
                                      outline="red", width=lw, tags="point_a_oval")
             self.canvas.create_oval(self.B[0]-r, self.B[1]-r, self.B[0]+r, self.B[1]+r,
                                      outline="blue", width=lw, tags="point_b_oval")
     
     def clear_drawn_path(self):
+        self._path_buffer.clear()
+        self._path_coords = []
+        self._path_item = None
         self.canvas.delete("path_line")
 
+    def _schedule_path_drain(self):
+        if self._path_drain_job is None:
+            self._path_drain_job = self.root.after(self.PATH_FRAME_MS, self._drain_path_buffer)
+
+    def _drain_path_buffer(self):
+        """
+        Runs on the Tk main loop once per frame: moves the points queued by the
+        simulation thread onto the canvas, extending the current polyline.
+        """
+        self._path_drain_job = None
+        buf = self._path_buffer
+        new_coords: list[float] = []
+        while buf:
+            new_coords.extend(buf.popleft())
+        if new_coords:
+            with self.stats.time("canvas_draw"):
+                self._extend_path(new_coords)
+        if self.running or buf:
+            self._schedule_path_drain()
+
+    def _extend_path(self, coords: list[float]):
+        # Incoming coords are split at the chunk boundary, so however many points one
+        # frame drains, no polyline grows past PATH_CHUNK_POINTS
+        limit = 2 * self.PATH_CHUNK_POINTS
+        pos = 0
+        while pos < len(coords):
+            take = limit - len(self._path_coords)
+            self._path_coords.extend(coords[pos:pos + take])
+            pos += take
+            if self._path_item is None:
+                pts = self._path_coords if len(self._path_coords) >= 4 else self._path_coords * 2
+                self._path_item = self.canvas.create_line(*pts, fill="black", width=self.PATH_LINE_WIDTH, tags="path_line",
+                                                          capstyle=tk.ROUND, joinstyle=tk.ROUND)
+            else:
+                self.canvas.coords(self._path_item, self._path_coords)
+
+            if len(self._path_coords) >= limit:
+                # Leave this polyline as is and continue in a new one from its last point
+                self._path_coords = self._path_coords[-2:]
+                self._path_item = None
+
     def handle_resize(self, event: tk.Event):
         if event.widget != self.root or self.running:
             return
         if self._resize_job:
             self.root.after_cancel(self._resize_job)
-        self._resize_job = self.root.after(250, self._refresh_canvas_environment)
+        # Resize-driven maps stay in memory only, so no full-map write blocks the Tk thread
+        self._resize_job = self.root.after(250, lambda: self._refresh_canvas_environment(persist=False))
 
     def _update_ui_state(self):
         is_running = self.running
@@ -250,19 +412,171 @@ class App:
         if not self.A or not self.B or self.noise_arr is None:
             messagebox.showinfo("Setup Needed", "A/B points & noise not ready. Try 'Apply & Redraw'.")
             return
-            
+        self._start_run(self._simulate_mouse_movement)
+
+    def replay_path_file(self, path: str | None = None):
+        """
+        Plays a saved trajectory file through the same cursor and drawing path
+        as a live run, streaming it chunk by chunk from a memory map.
+        Args:
+            path: Trajectory file. Asks for one if not given.
+        """
+        if self.running: return
+        if path is None:
+            path = filedialog.askopenfilename(title="Replay Path File",
+                                              filetypes=[("Trajectories", f"*{TRAJECTORY_SUFFIX}"), ("All files", "*")])
+            if not path:
+                return
+        try:
+            reader = TrajectoryReader(path)
+        except (OSError, TrajectoryFileError) as e:
+            messagebox.showerror("Replay Error", f"Could not open {path}: {e}")
+            return
+        self._start_run(self._replay_trajectory, reader)
+
+    def save_last_path(self, path: str | None = None):
+        """
+        Saves the points emitted by the last simulation, with their timestamps,
+        as a trajectory file.
+        Args:
+            path: Output file. Asks for one if not given.
+        """
+        if self.running: return
+        if not self._run_record or self._run_info is None:
+            messagebox.showinfo("Nothing to Save", "Run a simulation first.")
+            return
+        if path is None:
+            path = filedialog.asksaveasfilename(title="Save Last Path", defaultextension=TRAJECTORY_SUFFIX,
+                                                filetypes=[("Trajectories", f"*{TRAJECTORY_SUFFIX}")])
+            if not path:
+                return
+        record = np.array(self._run_record, dtype=np.float64)
+        points = record[:, 1:]
+        timestamps = record[:, 0] - record[0, 0]
+        encoding = "int16" if fits_int16(points) else "float32" # Steps too long for int16 deltas
+        try:
+            save_trajectory(path, points, timestamps=timestamps, encoding=encoding, **self._run_info)
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Could not write {path}: {e}")
+
+    def _start_run(self, target, *args):
+        # Read the geometry here, as the simulation thread must not call into Tk
+        canvas_origin = (self.root.winfo_rootx() + self.canvas.winfo_x(),
+                         self.root.winfo_rooty() + self.canvas.winfo_y())
+        canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+
         self.running = True
         self._update_ui_state()
         self.clear_drawn_path() 
+        self._schedule_path_drain()
         
-        threading.Thread(target=self._simulate_mouse_movement, daemon=True).start()
+        threading.Thread(target=target, args=(canvas_origin, canvas_size, *args), daemon=True).start()
 
     def stop_simulation(self, event=None):
         if self.running:
             self.running = False
             # Simulation thread will call _update_ui_state on exit.
 
-    def _simulate_mouse_movement(self):
+    def _record_segment_stats(self, played: np.ndarray, report: PlaybackReport) -> float:
+        """
+        Adds one played segment (or replay chunk) to the step counters.
+        Returns:
+            Length of the played points in pixels.
+        """
+        stats = self.stats
+        if not stats.enabled:
+            return 0.0
+        length = float(np.hypot(*np.diff(played, axis=0).T).sum()) if len(played) > 1 else 0.0
+        stats.incr("steps", report.emitted)
+        stats.incr("overruns", report.overruns)
+        stats.incr("skipped_steps", report.skipped)
+        stats.incr("path_length_pixels", length)
+        # Lateness of each step against its deadline, i.e. sleep/spin overshoot plus overruns
+        stats.observe_many("step_lateness", report.lateness)
+        return length
+
+    def _record_run_stats(self, length: float, report: RouteReport):
+        """Records one finished run, given its total length and the report over all its segments."""
+        stats = self.stats
+        if not stats.enabled:
+            return
+        stats.incr("runs")
+        stats.set_gauge("last_path_length_pixels", length)
+        stats.set_gauge("last_achieved_rate_hz", report.achieved_rate)
+
+    def _make_emit(self, canvas_origin: tuple[int, int], record: list | None = None):
+        """
+        Returns the per-step callback of a run: moves the cursor and queues the
+        point for drawing, and appends (t, x, y) to record if one is given.
+        """
+        canvas_x_on_screen, canvas_y_on_screen = canvas_origin
+        stats = self.stats
+        current: tuple[float, float] | None = None
+
+        def emit(next_cx: float, next_cy: float):
+            nonlocal current
+            # Move real mouse & queue the segment for drawing
+            if stats.enabled:
+                t0 = time.perf_counter()
+                self.cursor.move_to(canvas_x_on_screen + next_cx, canvas_y_on_screen + next_cy)
+                stats.observe("cursor_move", time.perf_counter() - t0)
+            else:
+                self.cursor.move_to(canvas_x_on_screen + next_cx, canvas_y_on_screen + next_cy)
+            if record is not None:
+                record.append((time.perf_counter(), next_cx, next_cy))
+
+            # Only queue if there's a change in position to avoid zero-length segments
+            if current is None or abs(current[0] - next_cx) > 1e-6 or abs(current[1] - next_cy) > 1e-6:
+                self._path_buffer.append((next_cx, next_cy))
+            current = (next_cx, next_cy)
+
+        return emit
+
+    def _replay_trajectory(self, canvas_origin: tuple[int, int], canvas_size: tuple[int, int], reader: TrajectoryReader):
+        try:
+            if tuple(reader.canvas_size) != tuple(canvas_size):
+                print(f"Replaying a path recorded on a {reader.canvas_size} canvas onto a {canvas_size} canvas.")
+            emit = self._make_emit(canvas_origin)
+            interval = reader.header["cfg"].get("sleep", self.cfg["sleep"])
+            start = None
+            t_first = None
+            reports = []
+            length = 0.0
+            # One chunk is decoded at a time; the timeline continues across chunks. Recorded
+            # timestamps, if any, set each point's due time relative to the first point.
+            for points, timestamps in reader.iter_chunks():
+                times = None
+                if timestamps is not None:
+                    if t_first is None:
+                        t_first = timestamps[0]
+                        start = time.perf_counter()
+                    times = timestamps - t_first
+                report = play_path(points, interval, emit, should_continue=lambda: self.running,
+                                   catch_up=self.PLAYBACK_CATCH_UP, start=start, times=times)
+                reports.append(report)
+                length += self._record_segment_stats(points[:report.emitted + report.skipped], report)
+                if not report.completed:
+                    break
+                if times is None:
+                    start = report.start + (report.emitted + report.skipped) * interval
+            totals = RouteReport(interval, reports, [], 0, all(r.completed for r in reports))
+            self._record_run_stats(length, totals)
+            print(f"Replayed {len(reader)} points from {reader.path}: {totals.totals.summary()}")
+        except CursorBackendError as e:
+            print(f"Cursor backend error during replay: {e}")
+            msg = f"Mouse control error: {e}" # e is unbound once the except block ends
+            self.root.after(0, lambda msg=msg: messagebox.showerror("Replay Error", msg))
+        except Exception as e:
+            import traceback
+            print(f"Unexpected error in replay: {e}\n{traceback.format_exc()}")
+            msg = f"An unexpected error occurred: {e}"
+            self.root.after(0, lambda msg=msg: messagebox.showerror("Replay Error", msg))
+        finally:
+            reader.close()
+            self.running = False
+            self.root.after(0, self._update_ui_state)
+
+    def _simulate_mouse_movement(self, canvas_origin: tuple[int, int], canvas_size: tuple[int, int]):
         if not self.A or not self.B or self.noise_arr is None:
             self.running = False
             self.root.after(0, self._update_ui_state)
@@ -271,93 +585,52 @@ class App:
         cfg_copy = self.cfg.copy() 
 
         try:
-            canvas_x_on_screen = self.root.winfo_rootx() + self.canvas.winfo_x()
-            canvas_y_on_screen = self.root.winfo_rooty() + self.canvas.winfo_y()
-            
-            Ax_canvas, Ay_canvas = self.A
-            Bx_canvas, By_canvas = self.B
-            
-            start_screen_x = canvas_x_on_screen + Ax_canvas
-            start_screen_y = canvas_y_on_screen + Ay_canvas
-
-            pyautogui.moveTo(start_screen_x, start_screen_y, duration=0)
-            
-            current_canvas_x, current_canvas_y = Ax_canvas, Ay_canvas
-            
-            self.canvas.create_line(current_canvas_x, current_canvas_y, current_canvas_x, current_canvas_y,
-                                    fill="black", width=self.PATH_LINE_WIDTH, tags="path_line", capstyle=tk.ROUND)
-
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
+            canvas_width, canvas_height = canvas_size
 
             if canvas_width <=0 or canvas_height <=0 or self.noise_arr is None: # Check for valid state
                 self.running = False
                 self.root.after(0, self._update_ui_state)
                 return
 
-            noise_map_h, noise_map_w = self.noise_arr.shape
-
-            while self.running:
-                dx_to_target = Bx_canvas - current_canvas_x
-                dy_to_target = By_canvas - current_canvas_y
-                dist_to_target_sq = dx_to_target*dx_to_target + dy_to_target*dy_to_target
-
-                # 1. Check if already at or very near target
-                if dist_to_target_sq < self.MIN_DISTANCE_TO_TARGET_SQUARED:
-                    next_cx, next_cy = Bx_canvas, By_canvas # Snap to target
-                else:
-                    # Calculate noise-influenced step
-                    norm_x = np.clip(current_canvas_x / canvas_width, 0.0, 0.99999)
-                    norm_y = np.clip(current_canvas_y / canvas_height, 0.0, 0.99999)
-                    ix = int(norm_x * noise_map_w)
-                    iy = int(norm_y * noise_map_h)
-                    noise_val = float(self.noise_arr[iy, ix])
-
-                    speed = cfg_copy["speed_min"] + noise_val * cfg_copy["speed_max_mul"]
-                    jitter_x = (random.random() - 0.5) * noise_val * cfg_copy["jitter_mul"]
-                    jitter_y = (random.random() - 0.5) * noise_val * cfg_copy["jitter_mul"]
-                    deviation = (noise_val - 0.5) * math.radians(cfg_copy["dev_deg"])
-                    
-                    angle_to_target = math.atan2(dy_to_target, dx_to_target)
-                    move_angle = angle_to_target + deviation
-
-                    # Tentative step components
-                    step_dx = math.cos(move_angle) * speed + jitter_x
-                    step_dy = math.sin(move_angle) * speed + jitter_y
-                    step_len_sq = step_dx*step_dx + step_dy*step_dy
-
-                    # 2. Check if this step would overshoot
-                    if step_len_sq >= dist_to_target_sq : # Overshoot or exact reach with this step
-                        next_cx, next_cy = Bx_canvas, By_canvas # Snap to target
-                    else:
-                        # Take the calculated step
-                        next_cx = current_canvas_x + step_dx
-                        next_cy = current_canvas_y + step_dy
-                
-                # Move real mouse & draw segment
-                pyautogui.moveTo(canvas_x_on_screen + next_cx, canvas_y_on_screen + next_cy, duration=0)
-                
-                # Only draw if there's a change in position to avoid zero-length lines
-                if abs(current_canvas_x - next_cx) > 1e-6 or abs(current_canvas_y - next_cy) > 1e-6:
-                    self.canvas.create_line(current_canvas_x, current_canvas_y, next_cx, next_cy,
-                                            fill="black", width=self.PATH_LINE_WIDTH, tags="path_line", capstyle=tk.ROUND)
-                
-                current_canvas_x, current_canvas_y = next_cx, next_cy
-
-                # 3. Check if we have arrived at B
-                if current_canvas_x == Bx_canvas and current_canvas_y == By_canvas:
-                    break 
-                
-                time.sleep(cfg_copy["sleep"])
-                if not self.running: break # Allow external stop
-
-        except pyautogui.PyAutoGUIException as e:
-            print(f"PyAutoGUI Error during simulation: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Simulation Error", f"Mouse control error: {e}"))
+            stats = self.stats
+            route = [self.A, *self.waypoints, self.B]
+            self._run_record = []
+            engine_name, seed, octaves, lacunarity, persistence = self.noise_engine.params
+            # Every run draws its own jitter seed, saved with the path so the run can be reproduced
+            run_seed = random.randrange(2**31)
+            self._run_info = {
+                "canvas_size": canvas_size,
+                "cfg": cfg_copy,
+                "seed": run_seed,
+                "noise": {"engine": engine_name, "seed": seed, "octaves": octaves, "lacunarity": lacunarity,
+                          "persistence": persistence, "scale": cfg_copy["noise_scale"], "res_scale": cfg_copy["res_scale"]},
+            }
+            emit = self._make_emit(canvas_origin, self._run_record)
+            length = 0.0
+
+            def on_segment(played: np.ndarray, segment_report: PlaybackReport):
+                nonlocal length
+                length += self._record_segment_stats(played, segment_report)
+
+            # Segment paths are computed in the background just ahead of playback
+            report = play_route(self.noise_arr, route, cfg_copy, (canvas_width, canvas_height), cfg_copy["sleep"], emit,
+                                should_continue=lambda: self.running, # Allow external stop
+                                catch_up=self.PLAYBACK_CATCH_UP, seed=run_seed, on_segment=on_segment)
+            self.last_playback_report = report
+            self._record_run_stats(length, report)
+            stats.observe_many("path_compute", report.compute_times)
+            stats.incr("route_stalls", report.stalls)
+            print(f"Playback: {report.summary()}")
+
+        except CursorBackendError as e:
+            print(f"Cursor backend error during simulation: {e}")
+            msg = f"Mouse control error: {e}" # e is unbound once the except block ends
+            self.root.after(0, lambda msg=msg: messagebox.showerror("Simulation Error", msg))
         except Exception as e:
             import traceback
             print(f"Unexpected error in simulation: {e}\n{traceback.format_exc()}")
-            self.root.after(0, lambda: messagebox.showerror("Simulation Error", f"An unexpected error occurred: {e}"))
+            msg = f"An unexpected error occurred: {e}"
+            self.root.after(0, lambda msg=msg: messagebox.showerror("Simulation Error", msg))
         finally:
             self.running = False
             self.root.after(0, self._update_ui_state)
\ No newline at end of file
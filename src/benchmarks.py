@@ -0,0 +1,190 @@
+# benchmarks.py
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from cursor_output import NullBackend, RecordingBackend
+from perlin_noise import Perlin
+from playback import play_path
+from trajectory import generate_path, generate_paths_batch
+
+# Resolutions from NOTES.md
+RESOLUTIONS = [(640, 480), (1280, 720), (1366, 768), (1920, 1080), (1920, 1200),
+               (2560, 1440), (2560, 1600), (3840, 2160), (7680, 4320)]
+QUICK_RESOLUTIONS = [(640, 480), (1920, 1080), (3840, 2160)]
+# (noise_scale, res_scale) sweep at Full HD, besides the (100, 1) resolution run
+NOISE_SWEEP = [(50.0, 1.0), (200.0, 1.0), (100.0, 0.5), (100.0, 0.25)]
+# Step parameters from the ideal configuration in NOTES.md
+PATH_CFG = {"speed_min": 20.0, "speed_max_mul": 2.0, "jitter_mul": 20.0, "dev_deg": 35.0}
+PATH_CANVAS = (1920, 1080)
+SEED = 1234
+
+
+def _measure(fn, repeats: int) -> tuple[float, int]:
+    """
+    Runs fn repeats times for timing, then once more under tracemalloc.
+    Returns:
+        (best wall time in seconds, peak traced bytes of the extra run).
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+
+    # tracemalloc slows Python-level code down, so memory is measured separately
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def _ab_pairs(n: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(SEED)
+    w, h = PATH_CANVAS
+    lo, hi = (11, 11), (w - 11, h - 11)
+    return rng.uniform(lo, hi, (n, 2)), rng.uniform(lo, hi, (n, 2))
+
+
+def _workloads(quick: bool) -> list[tuple[str, str, object]]:
+    """
+    Lists the benchmark workloads.
+    Returns:
+        (name, unit, setup) triples; setup() returns (fn, items processed per call).
+    """
+    workloads = []
+    perlin = Perlin(seed=SEED)
+
+    def noise(w: int, h: int, scale: float, rs: float):
+        mw, mh = max(1, int(w * rs)), max(1, int(h * rs))
+        return lambda: perlin.noise_array(mw, mh, scale, dtype=np.float32), mw * mh
+
+    for w, h in (QUICK_RESOLUTIONS if quick else RESOLUTIONS):
+        workloads.append((f"noise/{w}x{h}/s100/r1", "pixels", lambda w=w, h=h: noise(w, h, 100.0, 1.0)))
+    for scale, rs in NOISE_SWEEP:
+        workloads.append((f"noise/1920x1080/s{scale:g}/r{rs:g}", "pixels",
+                          lambda scale=scale, rs=rs: noise(1920, 1080, scale, rs)))
+
+    noise_map = perlin.noise_array(*PATH_CANVAS, 100.0, dtype=np.float32)
+    n_single = 50 if quick else 200
+    n_batch = 2000 if quick else 10000
+
+    def single():
+        starts, targets = _ab_pairs(n_single)
+        total = sum(len(generate_path(noise_map, a, b, PATH_CFG, PATH_CANVAS, seed=SEED))
+                    for a, b in zip(starts, targets))
+        return lambda: [generate_path(noise_map, a, b, PATH_CFG, PATH_CANVAS, seed=SEED)
+                        for a, b in zip(starts, targets)], total
+
+    def batch():
+        starts, targets = _ab_pairs(n_batch)
+        points, _ = generate_paths_batch(noise_map, starts, targets, PATH_CFG, PATH_CANVAS, seed=SEED)
+        return lambda: generate_paths_batch(noise_map, starts, targets, PATH_CFG, PATH_CANVAS, seed=SEED), len(points)
+
+    def playback(backend_cls):
+        starts, targets = _ab_pairs(n_batch)
+        points, _ = generate_paths_batch(noise_map, starts, targets, PATH_CFG, PATH_CANVAS, seed=SEED)
+        points = points.tolist()
+        def run():
+            backend = backend_cls()
+            play_path(points, 0.0, backend.move_to)
+        return run, len(points)
+
+    workloads.append((f"path/single/{n_single}", "points", single))
+    workloads.append((f"path/batch/{n_batch}", "points", batch))
+    workloads.append(("playback/null", "points", lambda: playback(NullBackend)))
+    workloads.append(("playback/recording", "points", lambda: playback(RecordingBackend)))
+    return workloads
+
+
+def run_benchmarks(quick: bool = False, repeats: int = 3, name_filter: str | None = None) -> dict:
+    """
+    Runs the benchmark suite.
+    Args:
+        quick: Use a smaller set of resolutions and path counts.
+        repeats: Timed runs per workload; the fastest is reported.
+        name_filter: Only run workloads whose name contains this substring.
+    Returns:
+        Machine-readable results: {"meta": {...}, "results": {name: {...}}}.
+    """
+    results = {}
+    for name, unit, setup in _workloads(quick):
+        if name_filter and name_filter not in name:
+            continue
+        fn, items = setup()
+        seconds, peak = _measure(fn, repeats)
+        results[name] = {
+            "seconds": seconds,
+            "peak_bytes": peak,
+            "items": items,
+            "unit": unit,
+            "items_per_s": items / seconds if seconds > 0 else 0.0,
+        }
+        print(f"{name:<32} {seconds * 1e3:10.2f} ms  {peak / 2**20:9.1f} MiB  {results[name]['items_per_s']:14,.0f} {unit}/s")
+
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "quick": quick,
+        "repeats": repeats,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Compares two result sets workload by workload.
+    Args:
+        current: Output of run_benchmarks.
+        baseline: Stored output of an earlier run.
+        threshold: Allowed relative slowdown, e.g. 0.2 for 20%.
+    Returns:
+        Descriptions of the workloads that regressed beyond the threshold.
+    """
+    regressions = []
+    for name, res in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or base["seconds"] <= 0:
+            continue
+        ratio = res["seconds"] / base["seconds"]
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"{name:<32} {ratio:6.2f}x baseline  {status}")
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless benchmarks for noise generation, path stepping and playback.")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for fast checks.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--filter", dest="name_filter", help="Only run workloads whose name contains this text.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against results stored in this JSON file.")
+    parser.add_argument("--save-baseline", help="Store these results as a baseline JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown (default 0.2 = 20%%).")
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.quick, args.repeats, args.name_filter)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        if regressions:
+            print("\n".join(["Regressions:"] + regressions))
+            sys.exit(1)
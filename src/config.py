@@ -0,0 +1,17 @@
+# config.py
+
+# Default configuration shared by the GUI and the command line
+DEFAULT_CFG = {
+    "win_w": 1920, "win_h": 1080,
+    "noise_engine": "perlin",
+    "noise_scale": 100.0,
+    "octaves": 1, "lacunarity": 2.0, "persistence": 0.5,
+    "res_scale": 1,
+    "speed_min": 30, "speed_max_mul": 1.5,
+    "jitter_mul": 20,
+    "dev_deg": 35.0,
+    "sleep": 0.03,
+    "waypoints": 0,
+    "seed": 0
+    # "target_threshold" is now removed
+}
@@ -0,0 +1,127 @@
+# cursor_output.py
+import time
+
+import numpy as np
+
+
+class CursorBackendError(Exception):
+    """
+    Raised when a backend fails to move the cursor.
+    """
+
+
+class CursorBackend:
+    """
+    Destination for cursor moves produced by playback.
+    """
+    name = ""
+
+    def move_to(self, x: float, y: float):
+        """
+        Moves the cursor to screen coordinates (x, y).
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases any resources held by the backend.
+        """
+
+
+class PyAutoGUIBackend(CursorBackend):
+    """
+    Moves the real system cursor with pyautogui. pyautogui needs a display,
+    so it is imported only when this backend is created.
+    """
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+        # pyautogui sleeps PAUSE seconds after every call by default; the
+        # playback scheduler owns the timing, so that pause must not stack on top.
+        pyautogui.PAUSE = 0
+
+    def move_to(self, x: float, y: float):
+        try:
+            self._pyautogui.moveTo(x, y, duration=0)
+        except self._pyautogui.PyAutoGUIException as e:
+            raise CursorBackendError(str(e)) from e
+
+
+class NullBackend(CursorBackend):
+    """
+    Discards every move; measures the pipeline without any output cost.
+    """
+    name = "null"
+
+    def __init__(self):
+        self.moves = 0
+
+    def move_to(self, x: float, y: float):
+        self.moves += 1
+
+
+class RecordingBackend(CursorBackend):
+    """
+    Records (timestamp, x, y) of every move into a preallocated ring buffer.
+    When more than capacity moves arrive, the oldest records are overwritten.
+    """
+    name = "recording"
+
+    def __init__(self, capacity: int = 1 << 16, clock=time.perf_counter):
+        """
+        Args:
+            capacity: Number of records kept.
+            clock: Timestamp source in seconds.
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive.")
+        self.capacity = capacity
+        self.clock = clock
+        self._buf = np.zeros((capacity, 3), dtype=np.float64)
+        self.count = 0 # Total moves seen, including overwritten ones
+
+    def move_to(self, x: float, y: float):
+        row = self._buf[self.count % self.capacity]
+        row[0] = self.clock()
+        row[1] = x
+        row[2] = y
+        self.count += 1
+
+    @property
+    def dropped(self) -> int:
+        """Number of records overwritten because the buffer was full."""
+        return max(0, self.count - self.capacity)
+
+    def records(self) -> np.ndarray:
+        """
+        Returns:
+            Copy of the retained records in chronological order, shape (n, 3)
+            with columns (timestamp, x, y).
+        """
+        if self.count <= self.capacity:
+            return self._buf[:self.count].copy()
+        head = self.count % self.capacity
+        return np.concatenate((self._buf[head:], self._buf[:head]))
+
+    def clear(self):
+        self.count = 0
+
+
+BACKENDS = {cls.name: cls for cls in (PyAutoGUIBackend, NullBackend, RecordingBackend)}
+BACKEND_NAMES = tuple(BACKENDS)
+
+
+def create_backend(name: str, **kwargs) -> CursorBackend:
+    """
+    Instantiates a cursor output backend by name.
+    Args:
+        name: One of BACKEND_NAMES.
+        **kwargs: Passed to the backend constructor.
+    Returns:
+        The cursor backend.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown cursor backend '{name}'. Choose one of: {', '.join(BACKEND_NAMES)}.")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,191 @@
+# dataset.py
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from noise_engine import create_engine
+from trajectory import generate_paths_batch, DEFAULT_MAX_STEPS
+
+MANIFEST_NAME = "manifest.json"
+# Keys of the manifest that must match for a run to be resumed
+_RESUME_KEYS = ("n_paths", "chunk_size", "shards", "seed", "cfg", "canvas_size", "padding", "max_steps")
+# cfg keys that affect generated data
+_DATASET_CFG_KEYS = ("noise_engine", "noise_scale", "res_scale", "octaves", "lacunarity", "persistence",
+                     "speed_min", "speed_max_mul", "jitter_mul", "dev_deg")
+
+
+def _chunk_paths(out_dir: str, chunk: int) -> tuple[str, str]:
+    """
+    Returns the (points, offsets) file paths of a chunk.
+    """
+    base = os.path.join(out_dir, f"chunk_{chunk:05d}")
+    return base + ".points.npy", base + ".offsets.npy"
+
+
+def _chunk_done(out_dir: str, chunk: int) -> bool:
+    """
+    A chunk is complete once its offsets file exists; it is renamed into place last.
+    """
+    points_path, offsets_path = _chunk_paths(out_dir, chunk)
+    return os.path.exists(points_path) and os.path.exists(offsets_path)
+
+
+def _random_pairs(rng: np.random.Generator, n: int, canvas_size: tuple[int, int],
+                  padding: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draws n random A/B pairs inside the canvas, keeping padding pixels from the edges.
+    """
+    w, h = canvas_size
+    lo = (padding, padding)
+    hi = (max(padding, w - padding), max(padding, h - padding))
+    return rng.uniform(lo, hi, (n, 2)), rng.uniform(lo, hi, (n, 2))
+
+
+def _write_chunk(out_dir: str, chunk: int, points: np.ndarray, offsets: np.ndarray):
+    """
+    Writes one chunk into preallocated memory-mapped .npy files.
+    Files are written under temporary names and renamed, so an interrupted
+    write never looks like a completed chunk.
+    """
+    points_path, offsets_path = _chunk_paths(out_dir, chunk)
+    tmp_points = points_path + ".tmp"
+    tmp_offsets = offsets_path + ".tmp"
+
+    mm = np.lib.format.open_memmap(tmp_points, mode="w+", dtype=np.float32, shape=points.shape)
+    mm[...] = points
+    mm.flush()
+    del mm
+    with open(tmp_offsets, "wb") as f:
+        np.save(f, offsets)
+
+    os.replace(tmp_points, points_path)
+    os.replace(tmp_offsets, offsets_path)
+
+
+def _run_shard(out_dir: str, shard: int, params: dict) -> int:
+    """
+    Worker entry point: generates every pending chunk belonging to one shard.
+    Each shard seeds its own noise permutation and noise map; A/B pairs and
+    jitter are seeded per chunk so a resumed run reproduces the same data.
+    Returns:
+        Number of chunks written by this call.
+    """
+    n_paths = params["n_paths"]
+    chunk_size = params["chunk_size"]
+    shards = params["shards"]
+    seed = params["seed"]
+    cfg = params["cfg"]
+    canvas_size = tuple(params["canvas_size"])
+
+    n_chunks = -(-n_paths // chunk_size)
+    pending = [c for c in range(shard, n_chunks, shards) if not _chunk_done(out_dir, c)]
+    if not pending:
+        return 0
+
+    engine = create_engine(cfg["noise_engine"], seed=seed * 1_000_003 + shard, octaves=cfg["octaves"],
+                           lacunarity=cfg["lacunarity"], persistence=cfg["persistence"])
+    rs = cfg["res_scale"]
+    noise_arr = engine.noise_array(max(1, int(canvas_size[0] * rs)), max(1, int(canvas_size[1] * rs)),
+                                   cfg["noise_scale"], dtype=np.float32, workers=1)
+
+    for chunk in pending:
+        rng = np.random.default_rng([seed, chunk])
+        n = min(chunk_size, n_paths - chunk * chunk_size)
+        starts, targets = _random_pairs(rng, n, canvas_size, params["padding"])
+        points, offsets = generate_paths_batch(noise_arr, starts, targets, cfg, canvas_size,
+                                               seed=rng, max_steps=params["max_steps"])
+        _write_chunk(out_dir, chunk, points, offsets)
+    return len(pending)
+
+
+def generate_dataset(out_dir: str, n_paths: int, cfg: dict, canvas_size: tuple[int, int] = (1920, 1080),
+                     chunk_size: int = 10_000, workers: int | None = None, seed: int = 0,
+                     padding: float = 11, max_steps: int = DEFAULT_MAX_STEPS) -> dict:
+    """
+    Generates a trajectory dataset across a process pool, streaming chunks to disk.
+    The work is split into shards, one per worker process. Each chunk is stored as
+    chunk_NNNNN.points.npy (float32, shape (total, 2)) plus chunk_NNNNN.offsets.npy
+    (int64, n + 1 entries; path i is points[offsets[i]:offsets[i + 1]]).
+    Calling again with the same arguments resumes after the last completed chunks.
+    Args:
+        out_dir: Output directory, created if needed.
+        n_paths: Total number of A/B paths to generate.
+        cfg: Configuration with "noise_scale", "res_scale" and the step parameters
+             ("speed_min", "speed_max_mul", "jitter_mul", "dev_deg"). The fractal
+             keys "octaves", "lacunarity", "persistence" and "noise_engine" are optional.
+        canvas_size: (width, height) of the virtual canvas.
+        chunk_size: Number of paths per chunk file.
+        workers: Number of shards, each run by one worker process; the shard count
+                 seeds the noise maps, so it must stay the same when resuming.
+                 Defaults to the shard count of the dataset being resumed, or
+                 to the CPU count for a new dataset.
+        seed: Master seed for noise maps, A/B pairs and jitter.
+        padding: Minimum distance of A/B points from the canvas edges.
+        max_steps: Maximum number of steps per path.
+    Returns:
+        The manifest dictionary, also stored as manifest.json in out_dir.
+    """
+    if n_paths <= 0 or chunk_size <= 0:
+        raise ValueError("n_paths and chunk_size must be positive.")
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    existing = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            existing = json.load(f)
+
+    n_chunks = -(-n_paths // chunk_size)
+    if workers is not None:
+        shards = max(1, min(workers, n_chunks))
+    elif existing is not None and "shards" in existing:
+        shards = existing["shards"] # Resuming on another machine must not change the data
+    else:
+        shards = max(1, min(os.cpu_count() or 1, n_chunks))
+    manifest = {
+        "n_paths": n_paths,
+        "chunk_size": chunk_size,
+        "n_chunks": n_chunks,
+        "shards": shards,
+        "seed": seed,
+        "cfg": {"noise_engine": "perlin", "octaves": 1, "lacunarity": 2.0, "persistence": 0.5,
+                **{k: cfg[k] for k in cfg if k in _DATASET_CFG_KEYS}},
+        "canvas_size": list(canvas_size),
+        "padding": padding,
+        "max_steps": max_steps,
+        "points_dtype": "float32",
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    if existing is not None:
+        mismatched = [k for k in _RESUME_KEYS if existing.get(k) != manifest[k]]
+        if mismatched:
+            raise ValueError(f"Existing dataset in {out_dir} was created with different settings: {', '.join(mismatched)}")
+    else:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    if shards == 1:
+        _run_shard(out_dir, 0, manifest)
+    else:
+        with ProcessPoolExecutor(max_workers=min(shards, os.cpu_count() or 1)) as pool:
+            futures = [pool.submit(_run_shard, out_dir, s, manifest) for s in range(shards)]
+            for f in futures:
+                f.result()
+    return manifest
+
+
+def iter_chunks(out_dir: str):
+    """
+    Iterates over the completed chunks of a dataset without loading them into memory.
+    Yields:
+        (points, offsets) per chunk, with points opened as a read-only memmap.
+    """
+    with open(os.path.join(out_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    for chunk in range(manifest["n_chunks"]):
+        if not _chunk_done(out_dir, chunk):
+            continue
+        points_path, offsets_path = _chunk_paths(out_dir, chunk)
+        yield np.load(points_path, mmap_mode="r"), np.load(offsets_path)
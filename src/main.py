@@ -1,8 +1,196 @@
 # main.py
-import tkinter as tk
-from app_gui import App # Import the App class
+import argparse
+import sys
+
+from config import DEFAULT_CFG
+from cursor_output import BACKEND_NAMES
+from metrics import EXPORT_FORMATS
+from noise_engine import ENGINE_NAMES
+from startup_check import DEFAULT_BUDGET_MS
+
+# Tk, PIL (and through the GUI, pyautogui) are imported by the commands that
+# need them, so the headless commands start fast and run without a display.
+
+# cfg keys that can be set from the command line, with their types
+_CFG_OPTIONS = {
+    "noise_engine": str, "noise_scale": float, "octaves": int, "lacunarity": float, "persistence": float,
+    "res_scale": float, "speed_min": float, "speed_max_mul": float, "jitter_mul": float, "dev_deg": float,
+}
+
+
+def _add_cfg_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--width", type=int, default=DEFAULT_CFG["win_w"], help="Canvas width in pixels.")
+    parser.add_argument("--height", type=int, default=DEFAULT_CFG["win_h"], help="Canvas height in pixels.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_CFG["seed"])
+    for key, type_ in _CFG_OPTIONS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=type_, default=DEFAULT_CFG[key],
+                            choices=ENGINE_NAMES if key == "noise_engine" else None)
+
+
+def _cfg_from_args(args: argparse.Namespace) -> dict:
+    return {**DEFAULT_CFG, **{key: getattr(args, key) for key in _CFG_OPTIONS}, "seed": args.seed}
+
+
+def _make_engine(cfg: dict):
+    from noise_engine import create_engine
+    return create_engine(cfg["noise_engine"], seed=cfg["seed"], octaves=cfg["octaves"],
+                         lacunarity=cfg["lacunarity"], persistence=cfg["persistence"])
+
+
+def _noise_map_size(args: argparse.Namespace, cfg: dict) -> tuple[int, int]:
+    rs = cfg["res_scale"]
+    return max(1, int(args.width * rs)), max(1, int(args.height * rs))
+
+
+def _cmd_gui(args: argparse.Namespace):
+    import tkinter as tk
+    from app_gui import App # Import the App class
+    from cursor_output import create_backend
+    from metrics import MetricsExporter, SimulationStats
+
+    stats = SimulationStats(enabled=args.metrics_file is not None)
+    exporter = None
+    if args.metrics_file:
+        exporter = MetricsExporter(stats, args.metrics_file, args.metrics_format, args.metrics_interval)
+        exporter.start()
 
-if __name__ == "__main__":
     root = tk.Tk()
-    app_instance = App(root) # Create an instance of your application
-    root.mainloop()
\ No newline at end of file
+    app_instance = App(root, cursor_backend=create_backend(args.cursor_backend), stats=stats) # Create an instance of your application
+    root.mainloop()
+    if exporter:
+        exporter.stop()
+
+
+def _cmd_noise(args: argparse.Namespace):
+    import numpy as np
+
+    cfg = _cfg_from_args(args)
+    map_w, map_h = _noise_map_size(args, cfg)
+    noise_map = _make_engine(cfg).noise_array(map_w, map_h, cfg["noise_scale"], dtype=np.float32)
+    if args.output.lower().endswith(".png"):
+        from PIL import Image
+        Image.fromarray(np.clip(noise_map * 255, 0, 255).astype(np.uint8), mode="L").save(args.output)
+    else:
+        np.save(args.output, noise_map)
+    print(f"Wrote {map_w}x{map_h} noise map to {args.output}")
+
+
+def _cmd_path(args: argparse.Namespace):
+    import numpy as np
+    from noise_field import PointNoiseField, TiledNoiseField
+    from trajectory import generate_path
+
+    cfg = _cfg_from_args(args)
+    canvas_size = (args.width, args.height)
+    map_w, map_h = _noise_map_size(args, cfg)
+    # A single route samples few cells, so the noise is evaluated per step (or per tile
+    # along the route with --tiled) instead of as a full map. Tiles are float64 like the
+    # point field, so both give the same path.
+    if args.tiled:
+        field = TiledNoiseField(_make_engine(cfg), map_w, map_h, cfg["noise_scale"], dtype=np.float64)
+    else:
+        field = PointNoiseField(_make_engine(cfg), map_w, map_h, cfg["noise_scale"])
+
+    rng = np.random.default_rng(args.seed)
+    padding = 11
+    def random_point() -> tuple[float, float]:
+        return (float(rng.uniform(padding, max(padding, args.width - padding))),
+                float(rng.uniform(padding, max(padding, args.height - padding))))
+    start = tuple(args.start) if args.start else random_point()
+    target = tuple(args.target) if args.target else random_point()
+    route = [start, *(random_point() for _ in range(args.waypoints)), target]
+
+    # Seeds each leg the way play_route does, so both give the same route for the same seed
+    segments = [np.asarray([start], dtype=np.float64)]
+    current = start
+    if args.tiled:
+        field.prefetch_line(start, route[1], canvas_size=canvas_size)
+    for i, waypoint in enumerate(route[1:]):
+        if args.tiled and i + 2 < len(route): # The next leg's tiles are computed while this one is stepped
+            field.prefetch_line(waypoint, route[i + 2], canvas_size=canvas_size)
+        path = generate_path(field, current, waypoint, cfg, canvas_size, seed=args.seed * 1_000_003 + i)
+        segments.append(path[1:])
+        current = (path[-1, 0], path[-1, 1])
+    points = np.concatenate(segments)
+    if args.tiled:
+        field.close()
+        print(f"Noise tiles: {field.misses} computed, {field.hits} hits")
+
+    if args.output.lower().endswith(".npy"):
+        np.save(args.output, points)
+    else:
+        from trajectory_file import save_trajectory, fits_int16
+        encoding = args.encoding
+        if encoding == "int16" and not fits_int16(points):
+            print("Steps are too long for the int16 encoding; writing float32 instead.")
+            encoding = "float32"
+        noise = {"engine": cfg["noise_engine"], "seed": cfg["seed"], "octaves": cfg["octaves"],
+                 "lacunarity": cfg["lacunarity"], "persistence": cfg["persistence"],
+                 "scale": cfg["noise_scale"], "res_scale": cfg["res_scale"]}
+        save_trajectory(args.output, points, canvas_size, cfg=cfg, seed=args.seed, noise=noise, encoding=encoding)
+    print(f"Wrote {len(points)} points ({len(route) - 1} segments) to {args.output}")
+
+
+def _cmd_dataset(args: argparse.Namespace):
+    from dataset import generate_dataset
+
+    manifest = generate_dataset(args.out_dir, args.n_paths, _cfg_from_args(args), (args.width, args.height),
+                                chunk_size=args.chunk_size, workers=args.workers, seed=args.seed)
+    print(f"Dataset of {manifest['n_paths']} paths in {manifest['n_chunks']} chunks at {args.out_dir}")
+
+
+def _cmd_startup_check(args: argparse.Namespace):
+    from startup_check import check_startup
+
+    failures = check_startup(args.budget_ms, args.repeats)
+    if failures:
+        print("\n".join(["Startup check failed:"] + failures))
+        sys.exit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Perlin Noise Mouse Simulator. Without a command, launches the GUI.")
+    parser.set_defaults(func=_cmd_gui)
+    parser.add_argument("--cursor-backend", choices=BACKEND_NAMES, default="pyautogui",
+                        help="Where cursor moves go: the real cursor (pyautogui), nowhere (null), "
+                             "or an in-memory recording (recording).")
+    parser.add_argument("--metrics-file", help="Enable instrumentation and periodically write metrics to this file.")
+    parser.add_argument("--metrics-format", choices=EXPORT_FORMATS, default="prometheus")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between metrics writes.")
+    commands = parser.add_subparsers(title="headless commands", metavar="COMMAND")
+
+    noise = commands.add_parser("noise", help="Generate a noise map (.npy, or .png if Pillow is installed).")
+    noise.add_argument("output")
+    _add_cfg_options(noise)
+    noise.set_defaults(func=_cmd_noise)
+
+    path = commands.add_parser("path", help="Generate a path and save it (.pmstraj trajectory file or .npy).")
+    path.add_argument("output")
+    path.add_argument("--start", type=float, nargs=2, metavar=("X", "Y"), help="Start point; random if omitted.")
+    path.add_argument("--target", type=float, nargs=2, metavar=("X", "Y"), help="Target point; random if omitted.")
+    path.add_argument("--waypoints", type=int, default=DEFAULT_CFG["waypoints"], help="Random waypoints between start and target.")
+    path.add_argument("--encoding", choices=("int16", "float32"), default="int16", help="Point encoding of .pmstraj files.")
+    path.add_argument("--tiled", action="store_true",
+                      help="Evaluate the noise in tiles prefetched along each leg instead of per step.")
+    _add_cfg_options(path)
+    path.set_defaults(func=_cmd_path)
+
+    dataset = commands.add_parser("dataset", help="Generate a chunked trajectory dataset.")
+    dataset.add_argument("out_dir")
+    dataset.add_argument("--n-paths", type=int, required=True)
+    dataset.add_argument("--chunk-size", type=int, default=10_000)
+    dataset.add_argument("--workers", type=int, help="Shards, one worker process each; defaults to the CPU count, "
+                                                     "or to the shard count of the dataset being resumed.")
+    _add_cfg_options(dataset)
+    dataset.set_defaults(func=_cmd_dataset)
+
+    startup = commands.add_parser("startup-check", help="Fail if importing the headless commands exceeds a time budget.")
+    startup.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    startup.add_argument("--repeats", type=int, default=5)
+    startup.set_defaults(func=_cmd_startup_check)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    args.func(args)
@@ -0,0 +1,225 @@
+# metrics.py
+import bisect
+import json
+import os
+import threading
+import time
+
+# Upper bounds (s) of the timing histogram buckets; a final +Inf bucket is implied
+DEFAULT_BUCKETS = (1e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 5.0)
+EXPORT_FORMATS = ("prometheus", "jsonl")
+METRIC_PREFIX = "pms"
+
+
+class Histogram:
+    """
+    Bucketed histogram of durations in seconds. Counts are kept per bucket
+    and only made cumulative when exported.
+    """
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "max": self.max,
+                "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts))}
+
+
+class _PhaseTimer:
+    """
+    Context manager timing one phase into a SimulationStats.
+    """
+    __slots__ = ("stats", "phase", "t0")
+
+    def __init__(self, stats: "SimulationStats", phase: str):
+        self.stats = stats
+        self.phase = phase
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.observe(self.phase, time.perf_counter() - self.t0)
+        return False
+
+
+class _NullTimer:
+    """
+    Shared do-nothing context manager returned while stats are disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class SimulationStats:
+    """
+    In-process metrics for the simulation: per-phase timing histograms, counters
+    and gauges. Everything is a no-op while disabled, so instrumentation can stay
+    in the hot paths; callers that time per step should also check .enabled
+    before reading the clock.
+    """
+    def __init__(self, enabled: bool = True, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._phases: dict[str, Histogram] = {}
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def time(self, phase: str):
+        """
+        Returns a context manager that records the duration of its block under phase.
+        """
+        return _PhaseTimer(self, phase) if self.enabled else _NULL_TIMER
+
+    def observe(self, phase: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._phases.get(phase)
+            if hist is None:
+                hist = self._phases[phase] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def observe_many(self, phase: str, values):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._phases.get(phase)
+            if hist is None:
+                hist = self._phases[phase] = Histogram(self.buckets)
+            for v in values:
+                hist.observe(v)
+
+    def incr(self, counter: str, amount: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def set_gauge(self, gauge: str, value: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[gauge] = value
+
+    def snapshot(self) -> dict:
+        """
+        Returns a JSON-serializable copy of all metrics.
+        """
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "phases": {name: h.snapshot() for name, h in self._phases.items()},
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._phases.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def to_prometheus(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+        """
+        snap = self.snapshot()
+        lines = []
+        if snap["phases"]:
+            name = f"{METRIC_PREFIX}_phase_seconds"
+            lines += [f"# HELP {name} Time spent per simulation phase.", f"# TYPE {name} histogram"]
+            for phase, h in sorted(snap["phases"].items()):
+                cumulative = 0
+                for le, count in h["buckets"].items():
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{phase="{phase}"}} {h["sum"]!r}')
+                lines.append(f'{name}_count{{phase="{phase}"}} {h["count"]}')
+        for counter, value in sorted(snap["counters"].items()):
+            lines += [f"# TYPE {METRIC_PREFIX}_{counter}_total counter", f"{METRIC_PREFIX}_{counter}_total {value!r}"]
+        for gauge, value in sorted(snap["gauges"].items()):
+            lines += [f"# TYPE {METRIC_PREFIX}_{gauge} gauge", f"{METRIC_PREFIX}_{gauge} {value!r}"]
+        return "\n".join(lines) + "\n"
+
+    def to_json_line(self) -> str:
+        return json.dumps(self.snapshot(), separators=(",", ":"))
+
+
+class MetricsExporter:
+    """
+    Periodically writes a SimulationStats to a local file from a daemon thread.
+    "prometheus" rewrites the file atomically each time (suitable for a node
+    exporter textfile collector); "jsonl" appends one snapshot per line.
+    """
+    def __init__(self, stats: SimulationStats, path: str, fmt: str = "prometheus", interval: float = 10.0):
+        """
+        Args:
+            stats: Metrics to export.
+            path: Output file.
+            fmt: One of EXPORT_FORMATS.
+            interval: Seconds between writes.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown metrics format '{fmt}'. Choose one of: {', '.join(EXPORT_FORMATS)}.")
+        self.stats = stats
+        self.path = path
+        self.fmt = fmt
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write(self):
+        """
+        Writes the current metrics once. Errors are reported, not raised.
+        """
+        try:
+            if self.fmt == "jsonl":
+                with open(self.path, "a") as f:
+                    f.write(self.stats.to_json_line() + "\n")
+            else:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(self.stats.to_prometheus())
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Metrics export failed: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the export thread and writes a final snapshot.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
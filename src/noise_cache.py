@@ -0,0 +1,174 @@
+# noise_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Default location of the on-disk cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "perlin_mouse_simulator", "noise")
+# Default in-memory budget (bytes) for recently used maps
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Default on-disk budget (bytes); least recently used files are deleted beyond it
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024
+
+
+class NoiseCache:
+    """
+    Two-level cache for generated noise maps.
+    Recent maps are kept in memory with LRU eviction under a byte budget; every
+    map is also stored on disk as a .npy file and reopened with mmap, so a map
+    computed in an earlier session loads without being recomputed. The disk
+    layer has its own byte budget: after each write, the files least recently
+    used (by modification time, refreshed on every disk hit) are deleted until
+    the directory fits.
+    Keys are tuples such as (seed, width, height, noise_scale, res_scale).
+    """
+    def __init__(self, cache_dir: str | None = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        """
+        Args:
+            cache_dir: Directory for .npy files. None disables the disk layer.
+            max_bytes: Upper bound on the bytes held by the in-memory layer.
+            max_disk_bytes: Upper bound on the bytes of .npy files kept in cache_dir.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: tuple) -> str:
+        """
+        Returns the disk path for a key. Keys are hashed so float parameters
+        never leak into file names.
+        """
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"noise_{digest}.npy")
+
+    def _remember(self, key: tuple, arr: np.ndarray):
+        """
+        Inserts arr into the in-memory LRU and evicts old entries over budget.
+        Must be called with the lock held.
+        """
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        if arr.nbytes > self.max_bytes:
+            return # Too large to keep in memory; the disk copy still serves it
+        self._entries[key] = arr
+        self._bytes += arr.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def get(self, key: tuple) -> np.ndarray | None:
+        """
+        Looks a map up in memory, then on disk.
+        Returns:
+            The cached (read-only) array, or None on a miss.
+        """
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is not None:
+                self._entries.move_to_end(key)
+                return arr
+
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            arr = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None # Missing or unreadable file counts as a miss
+        try:
+            os.utime(path) # Marks the file as recently used for disk pruning
+        except OSError:
+            pass
+
+        with self._lock:
+            self._remember(key, arr)
+        return arr
+
+    def put(self, key: tuple, arr: np.ndarray, persist: bool = True):
+        """
+        Stores a map in memory and on disk. Disk errors are reported but not raised,
+        as the cache is only an accelerator.
+        Args:
+            key: Cache key.
+            arr: Map to store; it is made read-only.
+            persist: False keeps the map in memory only, skipping the synchronous disk write.
+        """
+        arr.flags.writeable = False # Cached maps are shared; guard against in-place edits
+        with self._lock:
+            self._remember(key, arr)
+
+        if self.cache_dir is None or not persist:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Noise cache write failed: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._prune_disk(keep=path)
+
+    def _prune_disk(self, keep: str):
+        """
+        Deletes the least recently used cache files until the directory is
+        within max_disk_bytes. The file at keep, just written, is never deleted.
+        """
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.startswith("noise_") and entry.name.endswith(".npy"):
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue # Deleted by another process meanwhile
+                        files.append((st.st_mtime, st.st_size, entry.path))
+        except OSError as e:
+            print(f"Noise cache prune failed: {e}")
+            return
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue # In use (e.g. mapped on Windows) or already gone
+            total -= size
+
+    def get_or_compute(self, key: tuple, compute, persist: bool = True) -> np.ndarray:
+        """
+        Returns the cached map for key, calling compute() and storing its result on a miss.
+        persist is passed to put.
+        """
+        arr = self.get(key)
+        if arr is None:
+            arr = compute()
+            self.put(key, arr, persist)
+        return arr
+
+    def clear_memory(self):
+        """
+        Drops every in-memory entry; files on disk are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,290 @@
+# noise_engine.py
+import importlib
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Registered backends: cfg name -> (module, class). Modules are imported on first use.
+_ENGINES = {
+    "perlin": ("perlin_noise", "Perlin"),
+    "simplex": ("simplex_noise", "SimplexNoise"),
+    "value": ("value_noise", "ValueNoise"),
+}
+ENGINE_NAMES = tuple(_ENGINES)
+
+
+def create_engine(name: str, **kwargs) -> "NoiseEngine":
+    """
+    Instantiates a noise backend by name.
+    Args:
+        name: One of ENGINE_NAMES.
+        **kwargs: Passed to the engine constructor (seed, octaves, lacunarity, persistence).
+    Returns:
+        The noise engine.
+    """
+    if name not in _ENGINES:
+        raise ValueError(f"Unknown noise engine '{name}'. Choose one of: {', '.join(ENGINE_NAMES)}.")
+    module_name, class_name = _ENGINES[name]
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+
+
+class NoiseEngine:
+    """
+    Base class for seedable 2D noise fields with values in [0, 1].
+    Subclasses implement _lattice(), a single-octave kernel over broadcastable
+    coordinate arrays; this class provides fractal octaves, banded multi-threaded
+    map generation, windows and point queries on top of it.
+    """
+    # Name used in the "noise_engine" cfg key
+    name = ""
+    # Target number of samples (pixels x octaves) per band when splitting a map
+    # across threads. Small enough to keep the per-band scratch cache friendly.
+    BAND_PIXELS = 1 << 17
+    # Maps below this size are computed on the calling thread only.
+    MIN_PARALLEL_PIXELS = 1 << 19
+    # Offset between octave lattices so their zero crossings do not line up at the origin
+    OCTAVE_SHIFT = 19.1919
+
+    def __init__(self, seed: int | None = None, octaves: int = 1,
+                 lacunarity: float = 2.0, persistence: float = 0.5):
+        """
+        Initializes the engine and its shuffled permutation table.
+        Args:
+            seed: Seed for the permutation shuffle. The same seed always yields the
+                  same noise; None draws a fresh permutation.
+            octaves: Number of noise layers summed together. 1 gives a single layer.
+            lacunarity: Frequency multiplier between successive octaves.
+            persistence: Amplitude multiplier between successive octaves.
+        """
+        if int(octaves) != octaves or octaves < 1:
+            raise ValueError("Octaves must be a positive integer.")
+        if lacunarity <= 0 or persistence <= 0:
+            raise ValueError("Lacunarity and persistence must be positive.")
+        self.seed = seed
+        self.octaves = int(octaves)
+        self.lacunarity = float(lacunarity)
+        self.persistence = float(persistence)
+        # Per-thread scratch buffers reused across bands
+        self._scratch_local = threading.local()
+        p_range = list(range(256))
+        random.Random(seed).shuffle(p_range)
+        self.p = np.array(p_range + p_range, dtype=np.intp) # Double the permutation table
+
+    @property
+    def params(self) -> tuple:
+        """
+        (engine name, seed, octaves, lacunarity, persistence): everything besides the
+        window and scale that determines the generated noise.
+        """
+        return (self.name, self.seed, self.octaves, self.lacunarity, self.persistence)
+
+    def _fade(self, t: np.ndarray) -> np.ndarray:
+        """
+        Computes the fade function 6t^5 - 15t^4 + 10t^3.
+        Args:
+            t: Input array.
+        Returns:
+            Array after applying the fade function.
+        """
+        return t*t*t*(t*(t*6-15)+10)
+
+    def _scratch(self, shape: tuple, dtype, n_float: int = 4, n_index: int = 1,
+                 n_complex: int = 0) -> tuple[np.ndarray, ...]:
+        """
+        Returns n_float float buffers, then n_complex complex buffers of the same
+        precision, then n_index index buffers, all of the given shape.
+        Buffers come from a per-thread pool sized for one band, so repeated
+        bands reuse the same memory; larger requests get fresh arrays.
+        """
+        size = int(np.prod(shape))
+        kinds = ((np.dtype(dtype), n_float), (np.result_type(dtype, np.complex64), n_complex),
+                 (np.dtype(np.intp), n_index))
+        if size > self.BAND_PIXELS * 2:
+            return tuple(np.empty(shape, kind) for kind, n in kinds for _ in range(n))
+
+        local = self._scratch_local
+        if getattr(local, "cap", 0) < size:
+            local.cap = max(size, self.BAND_PIXELS)
+            local.pool = {} # Buffers per dtype
+        buffers = []
+        for kind, n in kinds:
+            pool = local.pool.setdefault(kind, [])
+            while len(pool) < n:
+                pool.append(np.empty(local.cap, kind))
+            buffers.extend(buf[:size].reshape(shape) for buf in pool[:n])
+        return tuple(buffers)
+
+    def _axis(self, coords: np.ndarray, dtype) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Splits 1D lattice coordinates into the per-axis terms used by the 2D kernel.
+        Integer/fractional parts are taken in float64 so large coordinates keep
+        their precision even when the map itself is float32.
+        Args:
+            coords: Lattice coordinates along one axis (float64).
+            dtype: Working dtype for the fractional terms.
+        Returns:
+            (cell index & 255, fractional part, fractional part - 1, faded fractional part).
+        """
+        cell = np.floor(coords)
+        frac = coords - cell
+        idx = cell.astype(np.intp) & 255
+        f0 = frac.astype(dtype, copy=False)
+        return idx, f0, f0 - 1, self._fade(f0)
+
+    def _lattice(self, xs: np.ndarray, ys: np.ndarray, dtype) -> np.ndarray:
+        """
+        Evaluates single-octave noise at lattice coordinates that broadcast
+        against each other. Implemented by each backend.
+        Args:
+            xs: X lattice coordinates (float64).
+            ys: Y lattice coordinates (float64).
+            dtype: Working and output dtype.
+        Returns:
+            Noise values between 0.0 and 1.0 with the broadcast shape of xs and ys.
+            May be a scratch buffer, valid only until the next call on this thread.
+        """
+        raise NotImplementedError
+
+    def _evaluate(self, xs: np.ndarray, ys: np.ndarray, dtype) -> np.ndarray:
+        """
+        Evaluates (fractal) noise at lattice coordinates that broadcast against each other.
+        With several octaves, the coordinates of every octave are stacked on a leading
+        axis so the lattice split, fades and permutation gathers for all octaves run
+        in one vectorized pass; the octaves are then summed with their amplitudes.
+        Args:
+            xs: X lattice coordinates (float64).
+            ys: Y lattice coordinates (float64).
+            dtype: Working and output dtype.
+        Returns:
+            Noise values between 0.0 and 1.0 with the broadcast shape of xs and ys.
+            May be a scratch buffer, valid only until the next call on this thread.
+        """
+        if self.octaves == 1:
+            return self._lattice(xs, ys, dtype)
+
+        nd = max(xs.ndim, ys.ndim)
+        octave_shape = (self.octaves,) + (1,) * nd
+        freqs = (self.lacunarity ** np.arange(self.octaves)).reshape(octave_shape)
+        shifts = (np.arange(self.octaves) * self.OCTAVE_SHIFT).reshape(octave_shape)
+        xs_o = xs.reshape((1,) * (nd - xs.ndim + 1) + xs.shape) * freqs + shifts
+        ys_o = ys.reshape((1,) * (nd - ys.ndim + 1) + ys.shape) * freqs + shifts
+
+        layers = self._lattice(xs_o, ys_o, dtype)
+        # Each layer is in [0, 1]; normalized weights keep the sum there too
+        weights = self.persistence ** np.arange(self.octaves)
+        weights /= weights.sum()
+        # Accumulated elementwise (not via BLAS) so results do not depend on the
+        # block shape and windows stitch exactly
+        res = layers[0] * dtype.type(weights[0])
+        for layer, weight in zip(layers[1:], weights[1:]):
+            res += layer * dtype.type(weight)
+        return res
+
+    def _band(self, xs: np.ndarray, ys: np.ndarray, out: np.ndarray):
+        """
+        Evaluates one rectangular block of noise with 2D broadcasting.
+        Args:
+            xs: X lattice coordinates of the block columns (float64).
+            ys: Y lattice coordinates of the block rows (float64).
+            out: Destination of shape (len(ys), len(xs)), written in place.
+        """
+        out[...] = self._evaluate(xs[None, :], ys[:, None], out.dtype)
+
+    def noise_at(self, xs, ys, scale: float, continuous: bool = False, dtype=np.float64):
+        """
+        Evaluates noise at arbitrary pixel coordinates without rasterizing a map.
+        Args:
+            xs: X pixel coordinate(s); any array shape broadcastable against ys.
+            ys: Y pixel coordinate(s).
+            scale: Scale factor for the noise coordinates, as in noise_array.
+            continuous: If False, coordinates are floored to their pixel, giving exactly
+                        noise_array(...)[iy, ix]. If True, the noise is evaluated at the
+                        exact fractional position, which is smooth (C2) rather than
+                        stepped or merely bilinear.
+            dtype: Output dtype, np.float64 (default) or np.float32.
+        Returns:
+            Noise value(s) between 0.0 and 1.0; a scalar for scalar inputs.
+        """
+        if scale <= 0:
+            scale = 0.001 # Prevent division by zero or invalid scale
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if not continuous:
+            xs = np.floor(xs)
+            ys = np.floor(ys)
+        # Backends work in place on their inputs, so scalars are evaluated as 1-element arrays
+        shape = np.broadcast_shapes(xs.shape, ys.shape)
+        res = self._evaluate(np.atleast_1d(xs / scale), np.atleast_1d(ys / scale), np.dtype(dtype)).reshape(shape)
+        return res[()] if res.ndim == 0 else res.copy()
+
+    def noise_array(self, w: int, h: int, scale: float,
+                    dtype=np.float64, workers: int | None = None) -> np.ndarray:
+        """
+        Generates a 2D noise array.
+        Large maps are split into row bands which are computed on a thread pool.
+        Args:
+            w: Width of the noise array.
+            h: Height of the noise array.
+            scale: Scale factor for the noise coordinates. Smaller values zoom in.
+                   Value must be positive.
+            dtype: Output dtype, np.float64 (default) or np.float32 to halve memory.
+            workers: Number of threads to use. Defaults to the CPU count.
+        Returns:
+            A 2D numpy array with noise values normalized between 0.0 and 1.0.
+        """
+        return self.noise_window(0, 0, w, h, scale, dtype=dtype, workers=workers)
+
+    def noise_window(self, x0: int, y0: int, w: int, h: int, scale: float,
+                     dtype=np.float64, workers: int | None = None) -> np.ndarray:
+        """
+        Generates the (x0, y0, w, h) window of the infinite noise plane.
+        Pixel (x, y) always has the same value regardless of the window it is
+        evaluated in, so windows can be stitched onto an existing map.
+        Args:
+            x0: Column of the window's left edge.
+            y0: Row of the window's top edge.
+            w: Width of the window.
+            h: Height of the window.
+            scale: Scale factor for the noise coordinates. Smaller values zoom in.
+                   Value must be positive.
+            dtype: Output dtype, np.float64 (default) or np.float32.
+            workers: Number of threads to use. Defaults to the CPU count.
+        Returns:
+            A 2D numpy array of shape (h, w) with noise values between 0.0 and 1.0.
+        """
+        if scale <= 0:
+            scale = 0.001 # Prevent division by zero or invalid scale
+
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError(f"Unsupported noise dtype: {dtype}")
+
+        w, h = max(0, w), max(0, h)
+        xs = (x0 + np.arange(w, dtype=np.float64)) / scale
+        ys = (y0 + np.arange(h, dtype=np.float64)) / scale
+        noise_map = np.empty((h, w), dtype=dtype)
+        if w <= 0 or h <= 0:
+            return noise_map
+
+        band_rows = max(1, self.BAND_PIXELS // (w * self.octaves))
+        bands = [(j, min(j + band_rows, h)) for j in range(0, h, band_rows)]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(bands))
+
+        if workers <= 1 or w * h < self.MIN_PARALLEL_PIXELS:
+            for j0, j1 in bands:
+                self._band(xs, ys[j0:j1], noise_map[j0:j1])
+            return noise_map
+
+        # numpy releases the GIL inside the heavy array ops, so bands overlap well
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._band, xs, ys[j0:j1], noise_map[j0:j1]) for j0, j1 in bands]
+            for f in futures:
+                f.result()
+        return noise_map
@@ -0,0 +1,209 @@
+# noise_field.py
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from noise_engine import NoiseEngine
+
+
+class TiledNoiseField:
+    """
+    Sparse, lazily computed noise map for virtual desktops too large to hold densely.
+    Built on any NoiseEngine. The field is split into square tiles that are generated on first access and kept
+    in a bounded LRU, so memory follows the area the cursor actually visits. It
+    supports the same noise[iy, ix] indexing and .shape as a dense noise map, so it
+    can be passed to the trajectory engine in place of one.
+    """
+    def __init__(self, engine: NoiseEngine, width: int, height: int, scale: float,
+                 tile_size: int = 256, max_tiles: int = 64, dtype=np.float32):
+        """
+        Args:
+            engine: Noise generator the tiles are evaluated with.
+            width: Width of the virtual noise map in cells.
+            height: Height of the virtual noise map in cells.
+            scale: Noise scale, as passed to noise_array.
+            tile_size: Edge length of a tile in cells.
+            max_tiles: Maximum number of tiles kept in memory.
+            dtype: dtype of the tiles.
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError("Field dimensions must be positive.")
+        if tile_size <= 0 or max_tiles <= 0:
+            raise ValueError("tile_size and max_tiles must be positive.")
+        self.engine = engine
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.dtype = np.dtype(dtype)
+        self.tiles_x = -(-width // tile_size)
+        self.tiles_y = -(-height // tile_size)
+        self.hits = 0
+        self.misses = 0
+        self._tiles: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefetcher: ThreadPoolExecutor | None = None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.height, self.width)
+
+    def _compute_tile(self, ty: int, tx: int) -> np.ndarray:
+        """
+        Evaluates one tile, clipped at the right and bottom edges of the field.
+        """
+        ts = self.tile_size
+        x0, y0 = tx * ts, ty * ts
+        w = min(ts, self.width - x0)
+        h = min(ts, self.height - y0)
+        return self.engine.noise_window(x0, y0, w, h, self.scale, dtype=self.dtype, workers=1)
+
+    def tile(self, ty: int, tx: int) -> np.ndarray:
+        """
+        Returns tile (ty, tx), computing it on a miss and evicting the least
+        recently used tile when over capacity.
+        """
+        key = (ty, tx)
+        with self._lock:
+            arr = self._tiles.get(key)
+            if arr is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return arr
+            self.misses += 1
+
+        # Computed outside the lock so sampling and prefetching can overlap
+        arr = self._compute_tile(ty, tx)
+        with self._lock:
+            existing = self._tiles.get(key)
+            if existing is not None: # Another thread got there first
+                self._tiles.move_to_end(key)
+                return existing
+            self._tiles[key] = arr
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return arr
+
+    def __getitem__(self, index):
+        iy, ix = index
+        ts = self.tile_size
+        if np.isscalar(iy) and np.isscalar(ix):
+            iy, ix = int(iy), int(ix)
+            if not (0 <= iy < self.height and 0 <= ix < self.width):
+                raise IndexError(f"Index ({iy}, {ix}) out of bounds for field of shape {self.shape}")
+            return self.tile(iy // ts, ix // ts)[iy % ts, ix % ts]
+
+        iy, ix = np.broadcast_arrays(np.asarray(iy, dtype=np.intp), np.asarray(ix, dtype=np.intp))
+        if iy.size and (iy.min() < 0 or ix.min() < 0 or iy.max() >= self.height or ix.max() >= self.width):
+            raise IndexError(f"Index out of bounds for field of shape {self.shape}")
+
+        out = np.empty(iy.shape, dtype=self.dtype)
+        tile_ids = (iy // ts) * self.tiles_x + ix // ts
+        for tile_id in np.unique(tile_ids):
+            mask = tile_ids == tile_id
+            ty, tx = divmod(int(tile_id), self.tiles_x)
+            out[mask] = self.tile(ty, tx)[iy[mask] % ts, ix[mask] % ts]
+        return out
+
+    def tiles_along_line(self, p0: tuple[float, float], p1: tuple[float, float],
+                         margin: float = 0.0, canvas_size: tuple[int, int] | None = None) -> list[tuple[int, int]]:
+        """
+        Lists the tiles within margin cells of the segment p0 -> p1, ordered from p0.
+        Args:
+            p0: Start (x, y) in noise map cells, or in canvas pixels if canvas_size is given.
+            p1: End (x, y), in the same units as p0.
+            margin: Extra distance (in cells) around the line, to cover paths that wander off it.
+            canvas_size: (width, height) of the canvas the field is stretched over, as
+                         passed to generate_path; p0 and p1 are then canvas pixels.
+        Returns:
+            List of (ty, tx) tile indices.
+        """
+        if canvas_size is not None:
+            sx, sy = self.width / canvas_size[0], self.height / canvas_size[1]
+            p0, p1 = (p0[0] * sx, p0[1] * sy), (p1[0] * sx, p1[1] * sy)
+        ts = self.tile_size
+        length = float(np.hypot(p1[0] - p0[0], p1[1] - p0[1]))
+        n = max(2, int(length / (ts / 2)) + 2) # At least two samples per tile crossed
+        t = np.linspace(0.0, 1.0, n)
+        xs = p0[0] + t * (p1[0] - p0[0])
+        ys = p0[1] + t * (p1[1] - p0[1])
+        reach = int(np.ceil(margin / ts))
+
+        seen: dict[tuple[int, int], None] = {}
+        for x, y in zip(xs, ys):
+            cty, ctx = int(y // ts), int(x // ts)
+            for ty in range(cty - reach, cty + reach + 1):
+                for tx in range(ctx - reach, ctx + reach + 1):
+                    if 0 <= ty < self.tiles_y and 0 <= tx < self.tiles_x:
+                        seen.setdefault((ty, tx))
+        return list(seen)
+
+    def prefetch_line(self, p0: tuple[float, float], p1: tuple[float, float],
+                      margin: float = 0.0, canvas_size: tuple[int, int] | None = None) -> Future:
+        """
+        Computes the tiles along p0 -> p1 on a background thread.
+        At most half the LRU capacity is prefetched, nearest to p0 first, so
+        prefetching never evicts the tiles it just produced.
+        Args:
+            p0: Start (x, y) in noise map cells, or in canvas pixels if canvas_size is given.
+            p1: End (x, y), in the same units as p0.
+            margin: Extra distance (in cells) around the line to prefetch.
+            canvas_size: (width, height) of the canvas, as for tiles_along_line.
+        Returns:
+            Future that resolves to the number of tiles touched.
+        """
+        tiles = self.tiles_along_line(p0, p1, margin, canvas_size)[:max(1, self.max_tiles // 2)]
+        if self._prefetcher is None:
+            self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="noise-prefetch")
+
+        def run() -> int:
+            for ty, tx in tiles:
+                self.tile(ty, tx)
+            return len(tiles)
+        return self._prefetcher.submit(run)
+
+    def close(self):
+        """
+        Stops the prefetch thread and drops all tiles.
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown(wait=True)
+            self._prefetcher = None
+        with self._lock:
+            self._tiles.clear()
+
+
+class PointNoiseField:
+    """
+    Noise map stand-in that evaluates only the cells that are sampled.
+    Each noise[iy, ix] lookup is answered by the engine's noise_at, so a headless path
+    costs one noise evaluation per step instead of rasterizing the whole map.
+    Values match engine.noise_array(width, height, scale)[iy, ix].
+    """
+    def __init__(self, engine: NoiseEngine, width: int, height: int, scale: float, dtype=np.float64):
+        """
+        Args:
+            engine: Noise generator to sample.
+            width: Width of the virtual noise map in cells.
+            height: Height of the virtual noise map in cells.
+            scale: Noise scale, as passed to noise_array.
+            dtype: dtype of the returned values.
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError("Field dimensions must be positive.")
+        self.engine = engine
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.height, self.width)
+
+    def __getitem__(self, index):
+        iy, ix = index
+        return self.engine.noise_at(ix, iy, self.scale, dtype=self.dtype)
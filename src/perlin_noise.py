@@ -1,129 +1,88 @@
 # perlin_noise.py
 import numpy as np
-import random
 
-class Perlin:
+from noise_engine import NoiseEngine
+
+class Perlin(NoiseEngine):
     """
-    Generates 2D Perlin noise.
+    Generates 2D Perlin noise, optionally as multi-octave fractal noise (fBm).
     """
-    def __init__(self):
-        """
-        Initializes the Perlin noise generator with a shuffled permutation table.
-        """
-        p_range = list(range(256))
-        random.shuffle(p_range)
-        self.p = np.array(p_range + p_range, dtype=int) # Double the permutation table
-
-    def _fade(self, t: np.ndarray) -> np.ndarray:
-        """
-        Computes the fade function 6t^5 - 15t^4 + 10t^3.
-        Args:
-            t: Input array.
-        Returns:
-            Array after applying the fade function.
-        """
-        return t*t*t*(t*(t*6-15)+10)
+    name = "perlin"
 
-    def _lerp(self, a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
-        """
-        Linear interpolation between a and b using t.
-        Args:
-            a: Start value(s).
-            b: End value(s).
-            t: Interpolation factor(s).
-        Returns:
-            Interpolated value(s).
-        """
-        return a + t*(b-a)
+    # Gradient components for h & 3, matching the classic 2D grad():
+    # 0: x + y, 1: -x + y, 2: -x + y, 3: -x - y
+    _GRAD_X = np.array([1.0, -1.0, -1.0, -1.0])
+    _GRAD_Y = np.array([1.0, 1.0, 1.0, -1.0])
 
-    def _grad(self, h: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    def __init__(self, seed: int | None = None, octaves: int = 1,
+                 lacunarity: float = 2.0, persistence: float = 0.5):
         """
-        Computes the gradient vector based on hash value h and coordinates x, y.
-        This is a vectorized version.
+        Initializes the Perlin noise generator with a shuffled permutation table.
         Args:
-            h: Hash values.
-            x: X coordinates.
-            y: Y coordinates.
-        Returns:
-            Dot product of gradient and (x,y).
+            seed: Seed for the permutation shuffle. The same seed always yields the
+                  same noise; None draws a fresh permutation.
+            octaves: Number of noise layers summed together. 1 gives plain Perlin noise.
+            lacunarity: Frequency multiplier between successive octaves.
+            persistence: Amplitude multiplier between successive octaves.
         """
-        h_mod = h & 3  # Equivalent to h % 4
-        u = np.where(h_mod < 2, x, y)
-        v = np.where(h_mod < 2, y, x)
-
-        part1 = np.where((h & 1) == 0, u, -u)
-        part2 = np.where((h & 2) == 0, v, -v)
-        return part1 + part2
+        super().__init__(seed, octaves, lacunarity, persistence)
+        # Gradient components looked up directly by permutation index,
+        # saving one gather per corner in the hot path.
+        self._gx = self._GRAD_X[self.p & 3]
+        self._gy = self._GRAD_Y[self.p & 3]
 
-    def noise_array(self, w: int, h: int, scale: float) -> np.ndarray:
+    def _lattice(self, xs: np.ndarray, ys: np.ndarray, dtype) -> np.ndarray:
         """
-        Generates a 2D Perlin noise array.
+        Evaluates single-octave noise at lattice coordinates; xs and ys broadcast
+        against each other, so a row vector and a column vector produce a full block.
+        All full-size intermediates live in the scratch buffers.
         Args:
-            w: Width of the noise array.
-            h: Height of the noise array.
-            scale: Scale factor for the noise coordinates. Smaller values zoom in.
-                   Value must be positive.
+            xs: X lattice coordinates (float64).
+            ys: Y lattice coordinates (float64).
+            dtype: Working and output dtype.
         Returns:
-            A 2D numpy array with noise values normalized between 0.0 and 1.0.
+            Noise values between 0.0 and 1.0 with the broadcast shape of xs and ys.
+            The array is a scratch buffer and is only valid until the next call.
         """
-        if scale <= 0:
-            scale = 0.001 # Prevent division by zero or invalid scale
-
-        # Generate coordinate arrays
-        xs = np.linspace(0, w/scale, w, endpoint=False)
-        ys = np.linspace(0, h/scale, h, endpoint=False)
-
-        # Integer and fractional parts of coordinates
-        xi0 = xs.astype(int)
-        yi0 = ys.astype(int)
-        xf0 = xs - xi0
-        yf0 = ys - yi0
-        xf1 = xf0 - 1.0
-        yf1 = yf0 - 1.0
+        xi, xf0, xf1, u = self._axis(xs, dtype)
+        yi, yf0, yf1, v = self._axis(ys, dtype)
 
-        # Fade curves for fractional parts
-        u = self._fade(xf0) # For x-interpolation
-        v_fade = self._fade(yf0) # For y-interpolation (per row)
+        perm, gx, gy = self.p, self._gx.astype(dtype, copy=False), self._gy.astype(dtype, copy=False)
+        px0 = perm[xi]
+        px1 = perm[xi + 1]
 
-        # Permutation table (already doubled)
-        perm = self.p
-        
-        # Ensure integer coordinates are within permutation table's single range [0, 255]
-        # for direct indexing, as values from perm table are used as indices.
-        xi0_mod = xi0 & 255
-        yi0_mod = yi0 & 255
-        
-        noise_map = np.empty((h, w), dtype=float)
+        shape = np.broadcast_shapes(xs.shape, ys.shape)
+        a, b, c, tmp, idx = self._scratch(shape, dtype)
 
-        for j in range(h):
-            # Calculate gradients for the four corners of the grid cell
-            # Indices for permutation table (p is already doubled, so idx+1 is fine)
-            # Top-left corner gradient index
-            idx00 = perm[xi0_mod] + yi0_mod[j]
-            # Top-right corner gradient index
-            idx10 = perm[xi0_mod + 1] + yi0_mod[j]
-            # Bottom-left corner gradient index
-            idx01 = perm[xi0_mod] + yi0_mod[j] + 1
-            # Bottom-right corner gradient index
-            idx11 = perm[xi0_mod + 1] + yi0_mod[j] + 1
-            
-            # Hash values from permutation table to select gradients
-            g00 = perm[idx00]
-            g10 = perm[idx10]
-            g01 = perm[idx01]
-            g11 = perm[idx11]
+        def dot(fx, fy, out):
+            # Dot product of the corner gradient at idx with the distance vector (fx, fy)
+            np.take(gx, idx, out=out, mode="clip")
+            np.multiply(out, fx, out=out)
+            np.take(gy, idx, out=tmp, mode="clip")
+            np.multiply(tmp, fy, out=tmp)
+            np.add(out, tmp, out=out)
 
-            # Calculate dot products of gradient vectors and distance vectors
-            n00 = self._grad(g00, xf0, yf0[j])
-            n10 = self._grad(g10, xf1, yf0[j]) # xf - 1
-            n01 = self._grad(g01, xf0, yf1[j]) # yf - 1
-            n11 = self._grad(g11, xf1, yf1[j]) # xf - 1, yf - 1
+        # Corners (0, 0) and (0, 1): hash index px0 + yi, then + 1
+        np.add(px0, yi, out=idx)
+        dot(xf0, yf0, a)
+        idx += 1
+        dot(xf0, yf1, b)
+        # Corners (1, 0) and (1, 1)
+        np.add(px1, yi, out=idx)
+        dot(xf1, yf0, c)
+        c -= a # a = lerp(n00, n10, u)
+        c *= u
+        a += c
+        idx += 1
+        dot(xf1, yf1, c)
+        c -= b # b = lerp(n01, n11, u)
+        c *= u
+        b += c
 
-            # Interpolate along x-axis
-            x_interp1 = self._lerp(n00, n10, u)
-            x_interp2 = self._lerp(n01, n11, u)
-            
-            # Interpolate along y-axis (using v_fade for the current row j)
-            noise_map[j] = (self._lerp(x_interp1, x_interp2, v_fade[j]) + 1) * 0.5  # Normalize to [0, 1]
-            
-        return noise_map
\ No newline at end of file
+        # Interpolate along y and normalize to [0, 1]
+        b -= a
+        b *= v
+        a += b
+        a += 1
+        a *= 0.5
+        return a
@@ -0,0 +1,202 @@
+# playback.py
+import bisect
+import math
+import time
+
+# Catch-up policies for steps that overrun their deadline
+CATCH_UP_POLICIES = ("skip", "compress")
+# Default margin (s) before a deadline where sleeping stops and spinning starts.
+# Covers the typical OS sleep overshoot without burning a core for the whole interval.
+DEFAULT_SPIN_THRESHOLD = 0.002
+
+
+class PlaybackReport:
+    """
+    Timing summary of one playback run.
+    """
+    def __init__(self, interval: float, emitted: int, skipped: int, overruns: int,
+                 duration: float, lateness: list[float], completed: bool, start: float = 0.0,
+                 first_emit: float = 0.0):
+        """
+        Args:
+            interval: Configured time between steps (s).
+            emitted: Number of points emitted.
+            skipped: Number of points dropped by the "skip" catch-up policy.
+            overruns: Number of points emitted more than one interval late.
+            duration: Time from the first to the last emitted point (s).
+            lateness: Per emitted point, the time emit() was called minus its deadline (s).
+            completed: False if playback was stopped before the last point.
+            start: Clock time the first point was due.
+            first_emit: Clock time the first point was emitted.
+        """
+        self.interval = interval
+        self.emitted = emitted
+        self.skipped = skipped
+        self.overruns = overruns
+        self.duration = duration
+        self.completed = completed
+        self.start = start
+        self.first_emit = first_emit
+        self.lateness = lateness
+        n = len(lateness)
+        self.mean_lateness = sum(lateness) / n if n else 0.0
+        self.max_lateness = max(lateness) if n else 0.0
+        # Jitter: standard deviation of the lateness around its mean
+        self.jitter = math.sqrt(sum((x - self.mean_lateness) ** 2 for x in lateness) / n) if n else 0.0
+
+    @property
+    def achieved_rate(self) -> float:
+        """Steps per second actually achieved between the first and last point."""
+        steps = self.emitted + self.skipped - 1
+        return steps / self.duration if self.duration > 0 and steps > 0 else 0.0
+
+    @property
+    def target_rate(self) -> float:
+        """Steps per second implied by the configured interval."""
+        return 1.0 / self.interval if self.interval > 0 else math.inf
+
+    def summary(self) -> str:
+        return (f"{self.emitted} steps in {self.duration:.3f}s: {self.achieved_rate:.1f} steps/s "
+                f"(target {self.target_rate:.1f}), jitter {self.jitter * 1e3:.3f} ms, "
+                f"max late {self.max_lateness * 1e3:.3f} ms, {self.overruns} overruns, {self.skipped} skipped"
+                + ("" if self.completed else ", stopped early"))
+
+
+class PlaybackTimeline:
+    """
+    Deadline and catch-up bookkeeping of one playback, shared by play_path and
+    the asyncio sessions of virtual_cursors. Point i is due at start + i * interval,
+    or at start + times[i] when per-point times are given. The timeline collects
+    the counters of the PlaybackReport, while the caller does the waiting and
+    emitting, so one timeline serves both blocking and async loops.
+    """
+    def __init__(self, n: int, interval: float, catch_up: str, start: float, times: list[float] | None = None):
+        """
+        Args:
+            n: Number of points to play.
+            interval: Time between points (s).
+            catch_up: Catch-up policy, one of CATCH_UP_POLICIES (see play_path).
+            start: Clock time times are relative to (the first point is due then on a uniform timeline).
+            times: Optional nondecreasing due time (s) of each point relative to start.
+        """
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy '{catch_up}'. Choose one of: {', '.join(CATCH_UP_POLICIES)}.")
+        self.n = n
+        self.interval = max(0.0, float(interval))
+        self.catch_up = catch_up
+        self.start = start
+        self.times = times
+        self.i = 0 # Index of the next point to emit
+        self.lateness: list[float] = []
+        self.emitted = self.skipped = self.overruns = 0
+        self.completed = True
+        self.first_emit = self.last_emit = start
+
+    @property
+    def done(self) -> bool:
+        return self.i >= self.n
+
+    def _due(self, i: int) -> float:
+        return self.start + (self.times[i] if self.times is not None else i * self.interval)
+
+    def deadline(self, now: float) -> float:
+        """
+        Deadline of the next point. With no interval and no times there is no
+        timeline, so it is due now.
+        """
+        return self._due(self.i) if self.times is not None or self.interval > 0 else now
+
+    def catch_up_at(self, now: float, deadline: float) -> float:
+        """
+        Applies the "skip" policy once the wait for deadline is over: if the
+        following point is already due, jumps to the point whose slot now is in,
+        never past the last one.
+        Returns:
+            The deadline of the point to emit next.
+        """
+        if self.catch_up != "skip" or self.i >= self.n - 1 or (self.times is None and self.interval <= 0):
+            return deadline
+        if now >= self._due(self.i + 1):
+            if self.times is not None:
+                target = bisect.bisect_right(self.times, now - self.start) - 1
+            else:
+                target = int((now - self.start) / self.interval)
+            target = max(self.i, min(self.n - 1, target))
+            self.skipped += target - self.i
+            self.i = target
+            deadline = self._due(target)
+        return deadline
+
+    def emitted_at(self, t: float, deadline: float):
+        """Records that the next point, due at deadline, was emitted at clock time t."""
+        if self.emitted == 0:
+            self.first_emit = t
+        self.last_emit = t
+        late = t - deadline
+        self.lateness.append(late)
+        if self.interval > 0 and late > self.interval:
+            self.overruns += 1
+        self.emitted += 1
+        self.i += 1
+
+    def report(self) -> PlaybackReport:
+        return PlaybackReport(self.interval, self.emitted, self.skipped, self.overruns,
+                              self.last_emit - self.first_emit, self.lateness, self.completed,
+                              self.start, self.first_emit)
+
+
+def play_path(points, interval: float, emit, should_continue=None, catch_up: str = "skip",
+              spin_threshold: float = DEFAULT_SPIN_THRESHOLD,
+              clock=time.perf_counter, sleep=time.sleep, start: float | None = None,
+              times=None) -> PlaybackReport:
+    """
+    Emits precomputed points on an absolute timeline: point i is due at
+    start + i * interval, so per-step work and sleep overshoot do not accumulate.
+    Each wait sleeps until spin_threshold before the deadline, then spins on
+    the clock for the remainder.
+    Args:
+        points: Sequence of (x, y) points; the first is emitted immediately.
+        interval: Time between points (s).
+        emit: Callback emit(x, y), the only work done inside the timed loop.
+        should_continue: Optional callback; playback stops when it returns False.
+        catch_up: What to do after falling behind by a full interval or more:
+                  "skip" drops the points whose slots have passed (the last point
+                  is always emitted); "compress" emits late points back to back
+                  until the timeline is caught up.
+        spin_threshold: Margin (s) before each deadline spent spinning instead of sleeping.
+        clock: Monotonic clock in seconds.
+        sleep: Sleep function in seconds.
+        start: Clock time the first point is due, e.g. to continue the timeline
+               of a previous run. Defaults to now.
+        times: Optional nondecreasing due time (s) of each point relative to start,
+               e.g. recorded timestamps, replacing i * interval. interval then only
+               sets the overrun threshold and the target rate of the report.
+    Returns:
+        A PlaybackReport describing the achieved timing.
+    """
+    if not isinstance(points, list):
+        points = points.tolist() if hasattr(points, "tolist") else list(points)
+    if times is not None and not isinstance(times, list):
+        times = times.tolist() if hasattr(times, "tolist") else list(times)
+    timeline = PlaybackTimeline(len(points), interval, catch_up, clock() if start is None else start, times)
+
+    while not timeline.done:
+        if should_continue is not None and not should_continue():
+            timeline.completed = False
+            break
+
+        now = clock()
+        deadline = timeline.deadline(now)
+        remaining = deadline - now
+        if remaining > spin_threshold:
+            sleep(remaining - spin_threshold)
+        while clock() < deadline:
+            pass
+
+        deadline = timeline.catch_up_at(clock(), deadline)
+        x, y = points[timeline.i]
+        t = clock()
+        emit(x, y)
+        timeline.emitted_at(t, deadline)
+
+    return timeline.report()
@@ -0,0 +1,204 @@
+# route.py
+import queue
+import threading
+import time
+
+from playback import play_path, PlaybackReport, DEFAULT_SPIN_THRESHOLD
+from trajectory import generate_path, DEFAULT_MAX_STEPS
+
+# Segments computed ahead of the one playing. 1 is enough when computing a
+# segment is faster than playing one; more absorbs occasional slow segments.
+DEFAULT_LOOK_AHEAD = 2
+# How often (s) a blocked producer or consumer re-checks for cancellation
+_POLL_INTERVAL = 0.05
+
+
+class RouteReport:
+    """
+    Timing summary of one route playback. Besides the per-segment reports,
+    totals is a PlaybackReport over the whole route (lateness of every step,
+    duration from the first to the last point, achieved rate and jitter).
+    """
+    def __init__(self, interval: float, segments: list[PlaybackReport], compute_times: list[float],
+                 stalls: int, completed: bool):
+        """
+        Args:
+            interval: Configured time between steps (s).
+            segments: Report of every segment played, in order.
+            compute_times: Time (s) spent computing the path of each segment played.
+            stalls: Number of segments that were not computed yet when playback needed them.
+            completed: False if playback was stopped before the last waypoint.
+        """
+        self.segments = segments
+        self.compute_times = compute_times
+        self.stalls = stalls
+        self.completed = completed
+        self.emitted = sum(r.emitted for r in segments)
+        self.skipped = sum(r.skipped for r in segments)
+        self.overruns = sum(r.overruns for r in segments)
+        duration = 0.0
+        if segments:
+            last = segments[-1]
+            duration = last.first_emit + last.duration - segments[0].first_emit
+        self.totals = PlaybackReport(interval, self.emitted, self.skipped, self.overruns, duration,
+                                     [late for r in segments for late in r.lateness], completed,
+                                     segments[0].start if segments else 0.0,
+                                     segments[0].first_emit if segments else 0.0)
+
+    @property
+    def achieved_rate(self) -> float:
+        """Steps per second achieved over the whole route, stalls included."""
+        return self.totals.achieved_rate
+
+    @property
+    def jitter(self) -> float:
+        """Standard deviation of the lateness of every step of the route (s)."""
+        return self.totals.jitter
+
+    def summary(self) -> str:
+        return f"{len(self.segments)} segments, {self.totals.summary()}, {self.stalls} stalls"
+
+
+class _Failure:
+    """
+    Carries an exception raised by the producer over to the consumer.
+    """
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+def _produce(noise_arr, waypoints, cfg: dict, canvas_size: tuple[int, int], seed: int | None,
+             max_steps: int, segments: queue.Queue, stop: threading.Event):
+    """
+    Computes the path of every segment in order and puts it on the queue,
+    together with the time taken to compute it. Each segment starts where the
+    previous path ended, which is the previous waypoint unless max_steps ran
+    out on the way there.
+    """
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                segments.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        start = waypoints[0]
+        for i, target in enumerate(waypoints[1:]):
+            seg_seed = None if seed is None else seed * 1_000_003 + i
+            t0 = time.perf_counter()
+            path = generate_path(noise_arr, start, target, cfg, canvas_size, seed=seg_seed, max_steps=max_steps)
+            if not put((path, time.perf_counter() - t0)):
+                return
+            start = (path[-1, 0], path[-1, 1])
+    except Exception as e:
+        put(_Failure(e))
+        return
+    put(_END)
+
+
+def play_route(noise_arr, waypoints, cfg: dict, canvas_size: tuple[int, int], interval: float, emit,
+               should_continue=None, catch_up: str = "skip", seed: int | None = None,
+               look_ahead: int = DEFAULT_LOOK_AHEAD, max_steps: int = DEFAULT_MAX_STEPS,
+               on_segment=None, spin_threshold: float = DEFAULT_SPIN_THRESHOLD,
+               clock=time.perf_counter, sleep=time.sleep) -> RouteReport:
+    """
+    Moves through a sequence of waypoints, one generated path per consecutive pair.
+    A background thread computes upcoming segments while the current one plays,
+    handing them over through a queue bounded to look_ahead segments, so memory
+    stays flat however long the route is. All segments share one timeline: the
+    first step of a segment is due one interval after the last step of the
+    previous one, unless that segment was not ready in time (a stall), in which
+    case the timeline restarts when it arrives.
+    Args:
+        noise_arr: Noise map or field, as for generate_path. It is only read.
+        waypoints: Sequence of at least two (x, y) points in canvas coordinates.
+        cfg: Configuration with the step parameters used by generate_path.
+        canvas_size: (width, height) of the canvas the points live on.
+        interval: Time between points (s).
+        emit: Callback emit(x, y) for every point, as for play_path.
+        should_continue: Optional callback; the route stops when it returns False.
+        catch_up: Catch-up policy passed to play_path.
+        seed: Seed for the jitter of every segment. None draws fresh entropy.
+        look_ahead: Maximum number of computed segments waiting to be played.
+        max_steps: Maximum number of steps per segment.
+        on_segment: Optional callback on_segment(played, report) after each segment, where
+                    played holds the points of the segment played so far, from its start point.
+        spin_threshold: Margin (s) before each deadline spent spinning instead of sleeping.
+        clock: Monotonic clock in seconds.
+        sleep: Sleep function in seconds.
+    Returns:
+        A RouteReport with the per-segment playback reports.
+    """
+    if len(waypoints) < 2:
+        raise ValueError("A route needs at least two waypoints.")
+    if look_ahead < 1:
+        raise ValueError("look_ahead must be at least 1.")
+    interval = max(0.0, float(interval))
+
+    segments: queue.Queue = queue.Queue(maxsize=look_ahead)
+    stop = threading.Event()
+    producer = threading.Thread(target=_produce, name="route-producer", daemon=True,
+                                args=(noise_arr, list(waypoints), cfg, canvas_size, seed, max_steps, segments, stop))
+    producer.start()
+
+    reports: list[PlaybackReport] = []
+    compute_times: list[float] = []
+    stalls = 0
+    completed = True
+    next_start: float | None = None
+    try:
+        while True:
+            if should_continue is not None and not should_continue():
+                completed = False
+                break
+            try:
+                item = segments.get_nowait()
+                waited = False
+            except queue.Empty:
+                item = None
+                waited = True
+                while item is None:
+                    if should_continue is not None and not should_continue():
+                        break
+                    try:
+                        item = segments.get(timeout=_POLL_INTERVAL)
+                    except queue.Empty:
+                        pass
+                if item is None:
+                    completed = False
+                    break
+
+            if item is _END:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            path, compute_time = item
+            if waited and reports:
+                stalls += 1
+                next_start = None # Falling behind on a stall is not the scheduler's fault
+
+            # The first point of a later segment is the last point of the previous one
+            points = path if not reports else path[1:]
+            compute_times.append(compute_time)
+            if len(points) == 0:
+                continue
+            report = play_path(points, interval, emit, should_continue=should_continue, catch_up=catch_up,
+                               spin_threshold=spin_threshold, clock=clock, sleep=sleep, start=next_start)
+            reports.append(report)
+            if on_segment is not None:
+                # Played part of the segment, including its start point
+                on_segment(path[:len(path) - len(points) + report.emitted + report.skipped], report)
+            if not report.completed:
+                completed = False
+                break
+            next_start = report.start + (report.emitted + report.skipped) * interval
+    finally:
+        stop.set()
+        producer.join()
+    return RouteReport(interval, reports, compute_times, stalls, completed)
@@ -0,0 +1,155 @@
+# simplex_noise.py
+import numpy as np
+
+from noise_engine import NoiseEngine
+
+class SimplexNoise(NoiseEngine):
+    """
+    Generates 2D simplex noise. Each sample blends 3 triangle corners instead of
+    Perlin's 4 square corners, and the kernel has no directional grid artifacts.
+    """
+    name = "simplex"
+
+    # Skew/unskew factors between the square grid and the triangle grid
+    _F2 = 0.5 * (np.sqrt(3.0) - 1.0)
+    _G2 = (3.0 - np.sqrt(3.0)) / 6.0
+    # Gradient directions for h % 12 (cube edge midpoints projected to 2D)
+    _GRAD = np.array([[1, 1], [-1, 1], [1, -1], [-1, -1],
+                      [1, 0], [-1, 0], [1, 0], [-1, 0],
+                      [0, 1], [0, -1], [0, 1], [0, -1]], dtype=np.float64)
+    # Scales the summed corner contributions to roughly [-1, 1]
+    _NORM = 70.0
+
+    def __init__(self, seed: int | None = None, octaves: int = 1,
+                 lacunarity: float = 2.0, persistence: float = 0.5):
+        """
+        Initializes the simplex noise generator with a shuffled permutation table.
+        Args:
+            seed: Seed for the permutation shuffle. None draws a fresh permutation.
+            octaves: Number of noise layers summed together. 1 gives plain simplex noise.
+            lacunarity: Frequency multiplier between successive octaves.
+            persistence: Amplitude multiplier between successive octaves.
+        """
+        super().__init__(seed, octaves, lacunarity, persistence)
+        # Gradient of every corner (a, b), a and b in [0, 256], hashed as a + p[b] and packed
+        # as gx + i*gy, so one gather per corner fetches both components. Indexed a * 257 + b.
+        corner = np.arange(257)[:, None] + self.p[:257][None, :]
+        grad = self._GRAD[self.p[corner] % 12]
+        table = (grad[..., 0] + 1j * grad[..., 1]).ravel()
+        self._grad_tables = {np.dtype(np.complex64): table.astype(np.complex64), np.dtype(np.complex128): table}
+
+    @staticmethod
+    def _split(v: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Splits v into its floor and fractional part."""
+        cell = np.floor(v)
+        return cell, v - cell
+
+    def _lattice(self, xs: np.ndarray, ys: np.ndarray, dtype) -> np.ndarray:
+        """
+        Evaluates single-octave simplex noise at lattice coordinates that broadcast
+        against each other. The cell split runs in float64 on the per-axis inputs only;
+        all full-size work runs in place in the scratch buffers, in the working dtype.
+        Args:
+            xs: X lattice coordinates (float64).
+            ys: Y lattice coordinates (float64).
+            dtype: Working and output dtype.
+        Returns:
+            Noise values between 0.0 and 1.0 with the broadcast shape of xs and ys.
+            The array is a scratch buffer and is only valid until the next call.
+        """
+        shape = np.broadcast_shapes(xs.shape, ys.shape)
+        x, y, step, t, d, res, grad, cell, corner, carry = self._scratch(shape, dtype, n_float=6, n_index=3, n_complex=1)
+
+        F2, G2 = self._F2, self._G2
+        # The skewed coordinates xs + s and ys + s, s = (xs + ys) * F2, are sums of an
+        # xs-only and a ys-only term. Each term is split into integer and fractional
+        # parts in float64 on the (unbroadcast) inputs, so large coordinates keep their
+        # precision and the full-size work is only the carry of the fractional parts.
+        xi, xi_f = self._split(xs * (1 + F2))
+        xj, xj_f = self._split(xs * F2)
+        yi, yi_f = self._split(ys * F2)
+        yj, yj_f = self._split(ys * (1 + F2))
+        # Both terms of x0 = xs - i + (i + j) * G2 (and y0) without the carries are small
+        x_of_xs = (xs - xi + (xi + xj) * G2).astype(dtype)
+        x_of_ys = ((yi + yj) * G2 - yi).astype(dtype)
+        y_of_xs = ((xi + xj) * G2 - xj).astype(dtype)
+        y_of_ys = (ys - yj + (yi + yj) * G2).astype(dtype)
+
+        # The containing cell is i = xi + yi + ci, j = xj + yj + cj, with the carries
+        # ci (in t) and cj (in d) of the fractional parts; cell gets i & 255 then the
+        # flat gradient table index (i & 255) * 257 + (j & 255)
+        np.add(xi_f.astype(dtype), yi_f.astype(dtype), out=t)
+        np.greater_equal(t, 1, out=carry)
+        np.greater_equal(t, 1, out=t)
+        np.add(xi.astype(np.intp) & 255, yi.astype(np.intp) & 255, out=cell)
+        cell += carry
+        cell &= 255
+        cell *= 257
+        np.add(xj_f.astype(dtype), yj_f.astype(dtype), out=d)
+        np.greater_equal(d, 1, out=carry)
+        np.greater_equal(d, 1, out=d)
+        np.add(xj.astype(np.intp) & 255, yj.astype(np.intp) & 255, out=corner)
+        corner += carry
+        corner &= 255
+        cell += corner
+        # Unskewed distance from the cell origin
+        np.add(t, d, out=res)
+        res *= dtype.type(G2) # Scalar constants in dtype, so float32 maps stay float32
+        np.add(x_of_xs, x_of_ys, out=x)
+        x -= t
+        x += res
+        np.add(y_of_xs, y_of_ys, out=y)
+        y -= d
+        y += res
+
+        table = self._grad_tables[grad.dtype]
+        g2 = dtype.type(G2)
+        one_minus_g2 = dtype.type(1.0 - G2)
+
+        def add_corner(index):
+            # Adds (0.5 - r^2)^4 * dot(gradient, (x, y)) of the corner at index to res;
+            # zero outside the corner's radius
+            np.multiply(x, x, out=t)
+            np.multiply(y, y, out=d)
+            np.add(t, d, out=t)
+            np.subtract(0.5, t, out=t)
+            np.maximum(t, 0, out=t)
+            np.multiply(t, t, out=t)
+            np.multiply(t, t, out=t)
+            np.take(table, index, out=grad, mode="clip")
+            np.multiply(grad.real, x, out=d)
+            np.multiply(d, t, out=d)
+            np.add(res, d, out=res)
+            np.multiply(grad.imag, y, out=d)
+            np.multiply(d, t, out=d)
+            np.add(res, d, out=res)
+
+        # Lower triangle steps x first (step = 1), upper triangle steps y first (step = 0)
+        np.greater(x, y, out=step)
+        np.greater(x, y, out=carry)
+        res.fill(0)
+
+        # Corner (0, 0)
+        add_corner(cell)
+        # Corner (step, 1 - step): x1 = x0 - step + G2, y1 = y0 - (1 - step) + G2
+        np.multiply(carry, 256, out=corner)
+        corner += cell
+        corner += 1
+        x -= step
+        x += g2
+        y += step
+        y -= one_minus_g2
+        add_corner(corner)
+        # Corner (1, 1): x2 = x0 - 1 + 2 * G2, y2 = y0 - 1 + 2 * G2
+        np.add(cell, 258, out=corner)
+        x += step
+        x -= one_minus_g2
+        y -= step
+        y += g2
+        add_corner(corner)
+
+        res *= self._NORM
+        res += 1
+        res *= 0.5
+        np.clip(res, 0.0, 1.0, out=res)
+        return res
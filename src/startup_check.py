@@ -0,0 +1,94 @@
+# startup_check.py
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules loaded by the headless subcommands of main.py
+HEADLESS_MODULES = ("main", "config", "noise_engine", "perlin_noise", "noise_field",
+                    "trajectory", "trajectory_file", "dataset")
+# Modules only the GUI needs; loading any of them on the headless path is a failure
+GUI_MODULES = ("tkinter", "PIL", "pyautogui")
+DEFAULT_BUDGET_MS = 300.0
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+# Runs in a fresh interpreter: times the imports and reports which GUI modules got loaded
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"ms": elapsed * 1e3,
+                  "gui": sorted(m for m in sys.modules if m.split(".")[0] in {gui!r})}}))
+"""
+
+
+def _parse_importtime(stderr: str) -> list[tuple[float, str]]:
+    """
+    Parses -X importtime output into (self time in ms, module) pairs.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            entries.append((int(parts[0]) / 1e3, parts[2].strip()))
+        except ValueError: # Column header line
+            continue
+    return entries
+
+
+def measure_imports(modules: tuple[str, ...] = HEADLESS_MODULES, repeats: int = 5) -> dict:
+    """
+    Imports modules in fresh interpreters and measures the cost.
+    Args:
+        modules: Modules to import, resolved from the src directory.
+        repeats: Number of interpreters to start; the fastest import is reported.
+    Returns:
+        {"ms": best import time, "gui": GUI modules that were loaded,
+         "slowest": [(self ms, module), ...] of the fastest run, slowest first}.
+    """
+    probe = _PROBE.format(modules=tuple(modules), gui=GUI_MODULES)
+    best = None
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=_SRC_DIR,
+                              capture_output=True, text=True, check=True)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["ms"] < best["ms"]:
+            result["slowest"] = sorted(_parse_importtime(proc.stderr), reverse=True)[:10]
+            best = result
+    return best
+
+
+def check_startup(budget_ms: float = DEFAULT_BUDGET_MS, repeats: int = 5) -> list[str]:
+    """
+    Checks that the headless path stays within its import budget and does not
+    load any GUI dependency.
+    Returns:
+        Descriptions of the failures; empty if the check passed.
+    """
+    result = measure_imports(HEADLESS_MODULES, repeats)
+    print(f"Headless imports: {result['ms']:.1f} ms (budget {budget_ms:.0f} ms)")
+    failures = []
+    if result["ms"] > budget_ms:
+        failures.append(f"import time {result['ms']:.1f} ms exceeds the budget of {budget_ms:.0f} ms")
+        for ms, module in result["slowest"]:
+            print(f"  {ms:8.1f} ms  {module}")
+    if result["gui"]:
+        failures.append(f"GUI modules loaded on the headless path: {', '.join(result['gui'])}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the import cost of the headless command line path.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = check_startup(args.budget_ms, args.repeats)
+    if failures:
+        print("\n".join(["Startup check failed:"] + failures))
+        sys.exit(1)
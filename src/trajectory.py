@@ -0,0 +1,211 @@
+# trajectory.py
+import math
+import numpy as np
+
+# Minimal distance (squared) to target for stopping, e.g., 0.5 pixels
+MIN_DISTANCE_TO_TARGET_SQUARED = 0.5 * 0.5
+# Upper bound on steps so degenerate configs (e.g. zero speed) still terminate
+DEFAULT_MAX_STEPS = 100_000
+# Number of steps worth of jitter drawn from the RNG at a time
+_JITTER_BLOCK = 1024
+
+
+def generate_path(noise_arr, A: tuple[float, float], B: tuple[float, float], cfg: dict,
+                  canvas_size: tuple[int, int], seed: int | None = None,
+                  max_steps: int = DEFAULT_MAX_STEPS) -> np.ndarray:
+    """
+    Computes a complete noise-driven path from A to B without touching the screen.
+    Each step samples the noise map at the current position, derives speed, jitter
+    and angular deviation from it, and steps towards B, snapping to B once a step
+    would reach or overshoot it.
+    Args:
+        noise_arr: 2D noise map (values in [0, 1]) indexed as noise_arr[iy, ix],
+                   or a TiledNoiseField/PointNoiseField with the same indexing.
+        A: Start point in canvas coordinates.
+        B: Target point in canvas coordinates.
+        cfg: Configuration with "speed_min", "speed_max_mul", "jitter_mul" and "dev_deg".
+        canvas_size: (width, height) of the canvas the points live on.
+        seed: Seed for the jitter RNG. None draws fresh entropy.
+        max_steps: Maximum number of steps before giving up on reaching B.
+    Returns:
+        Array of shape (n, 2) with the visited points, starting at A. The last
+        point is B unless max_steps was exhausted.
+    """
+    canvas_w, canvas_h = canvas_size
+    if canvas_w <= 0 or canvas_h <= 0:
+        raise ValueError("Canvas size must be positive.")
+
+    noise_map_h, noise_map_w = noise_arr.shape[:2]
+    # Scale factors from canvas pixels to noise cells, with the same
+    # 0.99999 clamp the GUI loop applied to the normalized position.
+    sx = noise_map_w / canvas_w
+    sy = noise_map_h / canvas_h
+    max_nx = 0.99999 * noise_map_w
+    max_ny = 0.99999 * noise_map_h
+
+    speed_min = float(cfg["speed_min"])
+    speed_max_mul = float(cfg["speed_max_mul"])
+    jitter_mul = float(cfg["jitter_mul"])
+    dev_rad = math.radians(cfg["dev_deg"])
+
+    rng = np.random.default_rng(seed)
+    atan2, cos, sin = math.atan2, math.cos, math.sin
+    min_dist_sq = MIN_DISTANCE_TO_TARGET_SQUARED
+
+    bx, by = float(B[0]), float(B[1])
+    cx, cy = float(A[0]), float(A[1])
+    xs = [cx]
+    ys = [cy]
+    jitter: list[float] = []
+    ji = 0
+
+    for _ in range(max_steps):
+        dx = bx - cx
+        dy = by - cy
+        dist_sq = dx*dx + dy*dy
+
+        if dist_sq < min_dist_sq:
+            cx, cy = bx, by # Snap to target
+        else:
+            nx = cx * sx
+            ny = cy * sy
+            ix = int(min(max(nx, 0.0), max_nx))
+            iy = int(min(max(ny, 0.0), max_ny))
+            noise_val = float(noise_arr[iy, ix])
+
+            if ji >= len(jitter):
+                jitter = (rng.random(2 * _JITTER_BLOCK) - 0.5).tolist()
+                ji = 0
+            jitter_x = jitter[ji] * noise_val * jitter_mul
+            jitter_y = jitter[ji + 1] * noise_val * jitter_mul
+            ji += 2
+
+            speed = speed_min + noise_val * speed_max_mul
+            move_angle = atan2(dy, dx) + (noise_val - 0.5) * dev_rad
+
+            step_dx = cos(move_angle) * speed + jitter_x
+            step_dy = sin(move_angle) * speed + jitter_y
+
+            if step_dx*step_dx + step_dy*step_dy >= dist_sq: # Overshoot or exact reach
+                cx, cy = bx, by
+            else:
+                cx += step_dx
+                cy += step_dy
+
+        xs.append(cx)
+        ys.append(cy)
+        if cx == bx and cy == by:
+            break
+
+    path = np.empty((len(xs), 2), dtype=np.float64)
+    path[:, 0] = xs
+    path[:, 1] = ys
+    return path
+
+
+def generate_paths_batch(noise_arr, starts: np.ndarray, targets: np.ndarray, cfg: dict,
+                         canvas_size: tuple[int, int], seed: int | None = None,
+                         max_steps: int = DEFAULT_MAX_STEPS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes many paths at once, advancing every unfinished path in lockstep.
+    Applies the same step rule as generate_path, vectorized over the batch;
+    paths that have snapped to their target are masked out of later steps.
+    Args:
+        noise_arr: 2D noise map (values in [0, 1]) indexed as noise_arr[iy, ix],
+                   or a TiledNoiseField/PointNoiseField with the same indexing.
+        starts: Array of shape (n, 2) with start points in canvas coordinates.
+        targets: Array of shape (n, 2) with target points in canvas coordinates.
+        cfg: Configuration with "speed_min", "speed_max_mul", "jitter_mul" and "dev_deg".
+        canvas_size: (width, height) of the canvas the points live on.
+        seed: Seed for the jitter RNG. None draws fresh entropy.
+        max_steps: Maximum number of steps per path.
+    Returns:
+        (points, offsets): points has shape (total, 2) with all paths stored back
+        to back; path i is points[offsets[i]:offsets[i + 1]]. offsets has n + 1 entries.
+    """
+    canvas_w, canvas_h = canvas_size
+    if canvas_w <= 0 or canvas_h <= 0:
+        raise ValueError("Canvas size must be positive.")
+
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+    if starts.shape != targets.shape:
+        raise ValueError("starts and targets must have the same shape.")
+    n = len(starts)
+
+    noise_map_h, noise_map_w = noise_arr.shape[:2]
+    sx = noise_map_w / canvas_w
+    sy = noise_map_h / canvas_h
+    max_nx = 0.99999 * noise_map_w
+    max_ny = 0.99999 * noise_map_h
+
+    speed_min = float(cfg["speed_min"])
+    speed_max_mul = float(cfg["speed_max_mul"])
+    jitter_mul = float(cfg["jitter_mul"])
+    dev_rad = math.radians(cfg["dev_deg"])
+
+    rng = np.random.default_rng(seed)
+
+    cx = starts[:, 0].copy()
+    cy = starts[:, 1].copy()
+    bx = targets[:, 0]
+    by = targets[:, 1]
+
+    # Per step we record which paths moved and where they ended up;
+    # the ragged layout is assembled once at the end.
+    step_ids: list[np.ndarray] = []
+    step_xs: list[np.ndarray] = []
+    step_ys: list[np.ndarray] = []
+    lengths = np.ones(n, dtype=np.int64) # Every path contains its start point
+    active = np.arange(n)
+
+    for _ in range(max_steps):
+        if len(active) == 0:
+            break
+        ax, ay = cx[active], cy[active]
+        tx, ty = bx[active], by[active]
+        dx = tx - ax
+        dy = ty - ay
+        dist_sq = dx*dx + dy*dy
+
+        ix = np.clip(ax * sx, 0.0, max_nx).astype(np.intp)
+        iy = np.clip(ay * sy, 0.0, max_ny).astype(np.intp)
+        noise_val = np.asarray(noise_arr[iy, ix], dtype=np.float64)
+
+        jitter = rng.random((2, len(active)))
+        jitter -= 0.5
+        jitter *= noise_val * jitter_mul
+
+        speed = speed_min + noise_val * speed_max_mul
+        move_angle = np.arctan2(dy, dx) + (noise_val - 0.5) * dev_rad
+        step_dx = np.cos(move_angle) * speed + jitter[0]
+        step_dy = np.sin(move_angle) * speed + jitter[1]
+
+        # Snap when already close enough or when this step would overshoot
+        snap = (dist_sq < MIN_DISTANCE_TO_TARGET_SQUARED) | (step_dx*step_dx + step_dy*step_dy >= dist_sq)
+        nx = np.where(snap, tx, ax + step_dx)
+        ny = np.where(snap, ty, ay + step_dy)
+
+        cx[active] = nx
+        cy[active] = ny
+        lengths[active] += 1
+        step_ids.append(active)
+        step_xs.append(nx)
+        step_ys.append(ny)
+
+        active = active[~((nx == tx) & (ny == ty))]
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    points = np.empty((offsets[-1], 2), dtype=np.float64)
+    points[offsets[:-1]] = starts
+
+    # Scatter each step into place: within a path, steps arrive in order,
+    # so a running per-path cursor gives each point's slot.
+    cursor = offsets[:-1] + 1
+    for ids, xs, ys in zip(step_ids, step_xs, step_ys):
+        slots = cursor[ids]
+        points[slots, 0] = xs
+        points[slots, 1] = ys
+        cursor[ids] += 1
+    return points, offsets
@@ -0,0 +1,334 @@
+# trajectory_file.py
+import json
+import os
+import struct
+
+import numpy as np
+
+# File layout, all little-endian:
+#   preamble  MAGIC, u16 version, u16 reserved, u32 header length
+#   header    UTF-8 JSON (canvas size, cfg, seed, noise parameters, encoding), padded to 8 bytes
+#   chunks    per chunk, the x column, the y column and optionally the t column
+#   index     one _INDEX_DTYPE record per chunk
+#   trailer   u64 index offset, u64 chunk count, END_MAGIC
+MAGIC = b"PMSTRAJ\x00"
+END_MAGIC = b"PMSTEND\x00"
+VERSION = 1
+ENCODINGS = ("int16", "float32")
+DEFAULT_CHUNK_POINTS = 4096
+# Step of the int16 encoding in pixels; deltas of up to 2047 px per point fit
+DEFAULT_QUANTUM = 1 / 16
+TRAJECTORY_SUFFIX = ".pmstraj"
+
+_PREAMBLE = struct.Struct("<8sHHI")
+_TRAILER = struct.Struct("<QQ8s")
+# anchor_x/anchor_y: first point of the chunk in quanta (int16 encoding only);
+# t0: timestamp of the first point, the t column holds float32 offsets from it,
+# which keeps timestamps exact to about 10 us within a chunk
+_INDEX_DTYPE = np.dtype([("offset", "<u8"), ("count", "<u4"), ("anchor_x", "<i4"),
+                         ("anchor_y", "<i4"), ("pad", "<u4"), ("t0", "<f8")])
+_COLUMN_DTYPES = {"int16": np.dtype("<i2"), "float32": np.dtype("<f4")}
+_TIME_DTYPE = np.dtype("<f4")
+
+
+class TrajectoryFileError(Exception):
+    """
+    Raised when a file is not a valid trajectory file.
+    """
+
+
+class TrajectoryWriter:
+    """
+    Streams points into a trajectory file chunk by chunk, so a trajectory of
+    any length can be written with bounded memory. The file is written under a
+    temporary name and renamed into place by close(); if writing fails, the
+    temporary file is removed and nothing appears at path.
+    "int16" stores each coordinate as the difference from the previous point
+    in units of quantum, about a quarter of the size of float64 pairs;
+    "float32" stores the coordinates as they are.
+    """
+    def __init__(self, path: str, canvas_size: tuple[int, int], cfg: dict | None = None,
+                 seed: int | None = None, noise: dict | None = None, encoding: str = "int16",
+                 timestamps: bool = False, chunk_points: int = DEFAULT_CHUNK_POINTS,
+                 quantum: float = DEFAULT_QUANTUM):
+        """
+        Args:
+            path: Output file.
+            canvas_size: (width, height) of the canvas the points live on.
+            cfg: Configuration the trajectory was generated with.
+            seed: Seed the trajectory was generated with.
+            noise: Parameters of the noise map the trajectory was generated on.
+            encoding: One of ENCODINGS.
+            timestamps: Whether every point carries a timestamp (s).
+            chunk_points: Points per chunk.
+            quantum: Coordinate step (px) of the int16 encoding.
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{encoding}'. Choose one of: {', '.join(ENCODINGS)}.")
+        if chunk_points <= 0 or quantum <= 0:
+            raise ValueError("chunk_points and quantum must be positive.")
+        self.path = path
+        self.encoding = encoding
+        self.timestamps = timestamps
+        self.chunk_points = chunk_points
+        self.quantum = quantum
+        self.header = {
+            "canvas_size": list(canvas_size),
+            "cfg": cfg or {},
+            "seed": seed,
+            "noise": noise or {},
+            "encoding": encoding,
+            "quantum": quantum,
+            "timestamps": timestamps,
+            "chunk_points": chunk_points,
+        }
+        self._index: list[tuple] = []
+        self._pending_xy: list[np.ndarray] = []
+        self._pending_t: list[np.ndarray] = []
+        self._pending = 0
+
+        header = json.dumps(self.header, separators=(",", ":")).encode("utf-8")
+        header += b" " * (-(_PREAMBLE.size + len(header)) % 8)
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(_PREAMBLE.pack(MAGIC, VERSION, 0, len(header)))
+        self._file.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def append(self, points, timestamps=None):
+        """
+        Adds points to the trajectory.
+        Args:
+            points: Array-like of shape (n, 2).
+            timestamps: Array-like of n timestamps (s); required if and only if
+                        the writer was created with timestamps=True.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.timestamps != (timestamps is not None):
+            raise ValueError("Timestamps must be given exactly when the writer was created with timestamps=True.")
+        self._pending_xy.append(points)
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+            if len(timestamps) != len(points):
+                raise ValueError("timestamps must have one entry per point.")
+            self._pending_t.append(timestamps)
+        self._pending += len(points)
+        while self._pending >= self.chunk_points:
+            self._flush(self.chunk_points)
+
+    def _take(self, parts: list[np.ndarray], n: int) -> np.ndarray:
+        """
+        Removes and returns the first n rows of the pending parts.
+        """
+        joined = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        parts[:] = [joined[n:]] if len(joined) > n else []
+        return joined[:n]
+
+    def _flush(self, n: int):
+        xy = self._take(self._pending_xy, n)
+        t = self._take(self._pending_t, n) if self.timestamps else None
+        self._pending -= n
+
+        offset = self._file.tell()
+        anchor_x = anchor_y = 0
+        if self.encoding == "int16":
+            q = np.rint(xy / self.quantum).astype(np.int64)
+            anchor_x, anchor_y = int(q[0, 0]), int(q[0, 1])
+            deltas = np.diff(q, axis=0, prepend=q[:1])
+            if deltas.size and (deltas.min() < -32768 or deltas.max() > 32767):
+                raise ValueError("A step is too large for the int16 encoding at this quantum; "
+                                 "use a larger quantum or the float32 encoding.")
+            columns = [deltas[:, 0], deltas[:, 1]]
+        else:
+            columns = [xy[:, 0], xy[:, 1]]
+        dtype = _COLUMN_DTYPES[self.encoding]
+        for col in columns:
+            self._file.write(np.ascontiguousarray(col, dtype=dtype).tobytes())
+        t0 = 0.0
+        if t is not None:
+            t0 = float(t[0])
+            self._file.write((t - t0).astype(_TIME_DTYPE).tobytes())
+        # Keep the next chunk 8-byte aligned so its columns can be viewed in place
+        self._file.write(b"\x00" * (-self._file.tell() % 8))
+        self._index.append((offset, n, anchor_x, anchor_y, 0, t0))
+
+    def close(self):
+        """
+        Writes the remaining points, the chunk index and the trailer, and moves
+        the file to its final path.
+        """
+        if self._file.closed:
+            return
+        try:
+            if self._pending:
+                self._flush(self._pending)
+            index_offset = self._file.tell()
+            self._file.write(np.array(self._index, dtype=_INDEX_DTYPE).tobytes())
+            self._file.write(_TRAILER.pack(index_offset, len(self._index), END_MAGIC))
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        """
+        Discards the file written so far.
+        """
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class TrajectoryReader:
+    """
+    Reads a trajectory file through a read-only memory map. Only the header
+    and chunk index are parsed up front; chunks are decoded on access, so a
+    trajectory can be streamed without loading it whole.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        except ValueError as e: # numpy cannot map an empty file
+            raise TrajectoryFileError(f"{path} is not a trajectory file: {e}") from e
+        mm = self._mm
+        if len(mm) < _PREAMBLE.size + _TRAILER.size:
+            raise TrajectoryFileError(f"{path} is too short to be a trajectory file.")
+        magic, version, _, header_len = _PREAMBLE.unpack(mm[:_PREAMBLE.size].tobytes())
+        if magic != MAGIC:
+            raise TrajectoryFileError(f"{path} is not a trajectory file.")
+        if version > VERSION:
+            raise TrajectoryFileError(f"{path} has format version {version}; this reader supports up to {VERSION}.")
+        index_offset, n_chunks, end_magic = _TRAILER.unpack(mm[-_TRAILER.size:].tobytes())
+        if end_magic != END_MAGIC:
+            raise TrajectoryFileError(f"{path} is truncated; it was not closed after writing.")
+
+        try:
+            self.header: dict = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + header_len].tobytes())
+            self.encoding: str = self.header["encoding"]
+            self.quantum: float = self.header["quantum"]
+            self.has_timestamps: bool = self.header["timestamps"]
+            self.index = np.frombuffer(mm, dtype=_INDEX_DTYPE, count=n_chunks, offset=index_offset)
+        except (ValueError, KeyError, TypeError) as e: # JSONDecodeError and UnicodeDecodeError are ValueErrors
+            raise TrajectoryFileError(f"{path} has a corrupt header or index: {e}") from e
+        if self.encoding not in ENCODINGS:
+            raise TrajectoryFileError(f"{path} uses an unknown encoding '{self.encoding}'.")
+        self._starts = np.concatenate(([0], np.cumsum(self.index["count"], dtype=np.int64)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.index)
+
+    @property
+    def canvas_size(self) -> tuple[int, int]:
+        w, h = self.header["canvas_size"]
+        return (w, h)
+
+    def chunk(self, i: int) -> tuple[np.ndarray, np.ndarray | None]:
+        """
+        Decodes one chunk.
+        Returns:
+            (points, timestamps): points has shape (n, 2) as float64; timestamps
+            has n entries, or is None if the file has none.
+        """
+        entry = self.index[i]
+        n = int(entry["count"])
+        offset = int(entry["offset"])
+        dtype = _COLUMN_DTYPES[self.encoding]
+        cols = np.frombuffer(self._mm, dtype=dtype, count=2 * n, offset=offset).reshape(2, n)
+        points = np.empty((n, 2), dtype=np.float64)
+        if self.encoding == "int16":
+            points[:, 0] = np.cumsum(cols[0], dtype=np.int64) + int(entry["anchor_x"])
+            points[:, 1] = np.cumsum(cols[1], dtype=np.int64) + int(entry["anchor_y"])
+            points *= self.quantum
+        else:
+            points[:, 0] = cols[0]
+            points[:, 1] = cols[1]
+
+        timestamps = None
+        if self.has_timestamps:
+            t = np.frombuffer(self._mm, dtype=_TIME_DTYPE, count=n, offset=offset + 2 * n * dtype.itemsize)
+            timestamps = t.astype(np.float64) + float(entry["t0"])
+        return points, timestamps
+
+    def iter_chunks(self):
+        """
+        Yields (points, timestamps) for every chunk in order.
+        """
+        for i in range(self.n_chunks):
+            yield self.chunk(i)
+
+    def read(self) -> tuple[np.ndarray, np.ndarray | None]:
+        """
+        Decodes the whole trajectory.
+        Returns:
+            (points, timestamps) as for chunk().
+        """
+        parts = list(self.iter_chunks())
+        if not parts:
+            return np.empty((0, 2), dtype=np.float64), (np.empty(0) if self.has_timestamps else None)
+        points = np.concatenate([p for p, _ in parts])
+        timestamps = np.concatenate([t for _, t in parts]) if self.has_timestamps else None
+        return points, timestamps
+
+    def close(self):
+        # Decoded chunks are copies, so dropping these releases the mapping
+        self.index = np.empty(0, dtype=_INDEX_DTYPE)
+        self._mm = None
+
+
+def fits_int16(points, quantum: float = DEFAULT_QUANTUM) -> bool:
+    """
+    Returns whether every step between consecutive points fits the int16
+    encoding at quantum.
+    """
+    q = np.rint(np.asarray(points, dtype=np.float64).reshape(-1, 2) / quantum).astype(np.int64)
+    deltas = np.diff(q, axis=0)
+    return deltas.size == 0 or bool(deltas.min() >= -32768 and deltas.max() <= 32767)
+
+
+def save_trajectory(path: str, points, canvas_size: tuple[int, int], timestamps=None, **kwargs):
+    """
+    Writes a complete trajectory to a file.
+    Args:
+        path: Output file.
+        points: Array-like of shape (n, 2).
+        canvas_size: (width, height) of the canvas the points live on.
+        timestamps: Optional array-like of n timestamps (s).
+        **kwargs: Passed to TrajectoryWriter (cfg, seed, noise, encoding, ...).
+    """
+    with TrajectoryWriter(path, canvas_size, timestamps=timestamps is not None, **kwargs) as writer:
+        writer.append(points, timestamps)
+
+
+def load_trajectory(path: str) -> tuple[np.ndarray, np.ndarray | None, dict]:
+    """
+    Reads a complete trajectory from a file.
+    Returns:
+        (points, timestamps, header).
+    """
+    with TrajectoryReader(path) as reader:
+        points, timestamps = reader.read()
+        return points, timestamps, reader.header
@@ -0,0 +1,216 @@
+# virtual_cursors.py
+import argparse
+import asyncio
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from perlin_noise import Perlin
+from playback import CATCH_UP_POLICIES, PlaybackReport, PlaybackTimeline
+from trajectory import generate_path, DEFAULT_MAX_STEPS
+
+# Deadlines this close (s) to the earliest one are released in the same wakeup
+DEFAULT_RESOLUTION = 0.001
+
+
+class DeadlineScheduler:
+    """
+    Shared timer for many coroutines waiting on absolute deadlines.
+    Waiters are kept in one heap and a single loop timer is armed for the
+    earliest deadline; when it fires, every waiter due within resolution of
+    now is released together. Hundreds of sessions stepping on the same
+    interval therefore cost one wakeup per tick instead of one each.
+    """
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION):
+        """
+        Args:
+            resolution: Waiters due within this many seconds of a wakeup are
+                        released by it, up to this much early.
+        """
+        self.resolution = resolution
+        self.wakeups = 0
+        self._heap: list[tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_when = 0.0
+
+    @staticmethod
+    def time() -> float:
+        """Current time of the running event loop (s); deadlines are on this clock."""
+        return asyncio.get_running_loop().time()
+
+    async def wait_until(self, deadline: float):
+        """
+        Suspends the calling coroutine until deadline (event loop time).
+        Deadlines already passed still yield to the loop once, so a session
+        that is catching up cannot starve the others.
+        """
+        loop = asyncio.get_running_loop()
+        if deadline - loop.time() <= self.resolution:
+            await asyncio.sleep(0)
+            return
+        fut = loop.create_future()
+        heapq.heappush(self._heap, (deadline, next(self._seq), fut))
+        self._arm(loop)
+        await fut
+
+    def _arm(self, loop: asyncio.AbstractEventLoop):
+        when = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_when <= when:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._fire, loop)
+        self._timer_when = when
+
+    def _fire(self, loop: asyncio.AbstractEventLoop):
+        self._timer = None
+        self.wakeups += 1
+        heap = self._heap
+        due = loop.time() + self.resolution
+        while heap and heap[0][0] <= due:
+            fut = heapq.heappop(heap)[2]
+            if not fut.done(): # Cancelled waiters are dropped
+                fut.set_result(None)
+        if heap:
+            self._arm(loop)
+
+
+class CursorSession:
+    """
+    One virtual cursor: a move from A to B with its own configuration and seed.
+    """
+    def __init__(self, session_id, A: tuple[float, float], B: tuple[float, float],
+                 cfg: dict, seed: int | None = None):
+        """
+        Args:
+            session_id: Identifier passed to the sink with every move.
+            A: Start point in canvas coordinates.
+            B: Target point in canvas coordinates.
+            cfg: Step parameters as for generate_path, plus "sleep", the time between steps (s).
+            seed: Seed for the jitter RNG. None draws fresh entropy.
+        """
+        self.session_id = session_id
+        self.A = A
+        self.B = B
+        self.cfg = cfg
+        self.seed = seed
+
+
+def random_sessions(n: int, cfg: dict, canvas_size: tuple[int, int], seed: int = 0,
+                    padding: float = 11) -> list[CursorSession]:
+    """
+    Creates n sessions with random A/B points sharing cfg, with distinct seeds.
+    """
+    rng = np.random.default_rng(seed)
+    w, h = canvas_size
+    lo = (padding, padding)
+    hi = (max(padding, w - padding), max(padding, h - padding))
+    starts, targets = rng.uniform(lo, hi, (n, 2)), rng.uniform(lo, hi, (n, 2))
+    return [CursorSession(i, tuple(a), tuple(b), cfg, seed * 1_000_003 + i)
+            for i, (a, b) in enumerate(zip(starts.tolist(), targets.tolist()))]
+
+
+def _compute_paths(noise_arr, sessions: list[CursorSession], canvas_size: tuple[int, int],
+                   max_steps: int) -> list[list]:
+    return [generate_path(noise_arr, s.A, s.B, s.cfg, canvas_size, seed=s.seed, max_steps=max_steps).tolist()
+            for s in sessions]
+
+
+async def _run_session(session: CursorSession, points: list, sink, scheduler: DeadlineScheduler,
+                       should_continue, catch_up: str) -> PlaybackReport:
+    """
+    Plays one session's path through the scheduler on the same PlaybackTimeline
+    as play_path.
+    """
+    clock = scheduler.time # Deadlines are on the scheduler's (event loop) clock
+    timeline = PlaybackTimeline(len(points), session.cfg.get("sleep", 0.0), catch_up, clock())
+    sid = session.session_id
+
+    while not timeline.done:
+        if should_continue is not None and not should_continue():
+            timeline.completed = False
+            break
+
+        deadline = timeline.deadline(clock())
+        await scheduler.wait_until(deadline)
+
+        deadline = timeline.catch_up_at(clock(), deadline)
+        x, y = points[timeline.i]
+        t = clock()
+        await sink(sid, x, y)
+        timeline.emitted_at(t, deadline)
+
+    return timeline.report()
+
+
+async def run_sessions(noise_arr, sessions: list[CursorSession], canvas_size: tuple[int, int], sink,
+                       should_continue=None, catch_up: str = "skip",
+                       scheduler: DeadlineScheduler | None = None,
+                       max_steps: int = DEFAULT_MAX_STEPS) -> dict:
+    """
+    Runs many virtual cursor sessions concurrently on the current event loop.
+    All sessions read the same noise map, which is shared read-only rather
+    than copied. Paths are computed up front in a worker thread, so path
+    stepping never competes with playback for the interpreter; the steps of
+    all sessions are then timed by one shared DeadlineScheduler.
+    Args:
+        noise_arr: Noise map or field, as for generate_path.
+        sessions: Sessions to run.
+        canvas_size: (width, height) of the canvas the points live on.
+        sink: Coroutine function sink(session_id, x, y) awaited for every move.
+              A slow sink delays only its own session.
+        should_continue: Optional callback; every session stops when it returns False.
+        catch_up: Catch-up policy, one of CATCH_UP_POLICIES, as for play_path.
+        scheduler: Scheduler to time the steps with. Defaults to a new one.
+        max_steps: Maximum number of steps per path.
+    Returns:
+        Dict mapping session_id to the PlaybackReport of that session.
+    """
+    if catch_up not in CATCH_UP_POLICIES:
+        raise ValueError(f"Unknown catch-up policy '{catch_up}'. Choose one of: {', '.join(CATCH_UP_POLICIES)}.")
+    if isinstance(noise_arr, np.ndarray):
+        noise_arr = noise_arr.view()
+        noise_arr.flags.writeable = False
+    scheduler = scheduler if scheduler is not None else DeadlineScheduler()
+    paths = await asyncio.get_running_loop().run_in_executor(
+        None, _compute_paths, noise_arr, sessions, canvas_size, max_steps)
+    reports = await asyncio.gather(*(
+        _run_session(s, points, sink, scheduler, should_continue, catch_up)
+        for s, points in zip(sessions, paths)))
+    return {s.session_id: r for s, r in zip(sessions, reports)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many virtual cursors on one event loop with a discarding sink.")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.01, help="Time between steps (s).")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    canvas = (args.width, args.height)
+    cfg = {"speed_min": 30, "speed_max_mul": 1.5, "jitter_mul": 20, "dev_deg": 35.0, "sleep": args.interval}
+    noise_map = Perlin(seed=args.seed).noise_array(*canvas, 100.0, dtype=np.float32)
+    moves = 0
+
+    async def count_sink(session_id, x: float, y: float):
+        global moves
+        moves += 1
+
+    async def main():
+        scheduler = DeadlineScheduler()
+        t0 = time.perf_counter()
+        reports = await run_sessions(noise_map, random_sessions(args.sessions, cfg, canvas, args.seed),
+                                     canvas, count_sink, scheduler=scheduler)
+        elapsed = time.perf_counter() - t0
+        lateness = np.concatenate([r.lateness for r in reports.values()])
+        print(f"{len(reports)} sessions, {moves} moves in {elapsed:.2f}s ({moves / elapsed:,.0f} moves/s), "
+              f"{scheduler.wakeups} wakeups; lateness mean {lateness.mean() * 1e3:.3f} ms, "
+              f"p99 {np.percentile(lateness, 99) * 1e3:.3f} ms, "
+              f"{sum(r.overruns for r in reports.values())} overruns, {sum(r.skipped for r in reports.values())} skipped")
+
+    asyncio.run(main())